@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from collections import deque
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+
+"""
+The generators in generators.py (and the stages in generator_pipelines.py) are synchronous; when one of
+their stages does I/O (a HTTP call, a database query) it blocks, and inside an asyncio application that
+means it blocks the whole event loop.  Python 3.6 added asynchronous generators for this, a function which
+is both `async def` and contains a `yield`:
+
+    >>> async def agen():
+    ...     for x in range(3):
+    ...         yield x
+    >>> inspect.isasyncgenfunction(agen)
+    True
+
+They are consumed with `async for` and offer `asend()`, `athrow()` and `aclose()`, the awaitable
+counterparts of `send()`, `throw()` and `close()`.
+
+A word of warning regarding `aclose()`.  Breaking out of a `for` loop early over a normal generator gets
+`close()` called on it as soon as it is garbage collected, which in CPython is straight away, raising
+GeneratorExit inside it so its finally blocks run.  Breaking out of an `async for` early does NOT do this
+promptly; closing an async generator means awaiting, which a garbage collector cannot do, so asyncio
+schedules it for some later point (or, if the loop is already gone, never).  Files, sockets and connections
+held open by the generator linger.  The fix is to always `await agen.aclose()` yourself, which is exactly
+what `drive()` does (`contextlib.aclosing` does the same as of python 3.10).
+"""
+
+
+async def agen():
+    for x in range(10000):
+        yield x
+
+
+async def amygen():
+    yield 20
+    yield 30
+
+
+async def drive(source: AsyncIterator, consume: Callable[[Any], Any] | None = None) -> int:
+    """
+    Drain an async generator, guaranteeing `aclose()` is awaited however the loop is left; exhaustion,
+    an exception in `consume`, or the driving task being cancelled.
+    :param source: The async generator (or any async iterator) to drain.
+    :param consume: Called with every item, awaited if it returns an awaitable.
+    :return: The number of items drained.
+    """
+    drained = 0
+    try:
+        async for item in source:
+            if consume is not None:
+                result = consume(item)
+                if inspect.isawaitable(result):
+                    await result
+            drained += 1
+    finally:
+        # Every stage of an AsyncPipeline closes the stage before it in turn.
+        await _aclose(source)
+    return drained
+
+
+async def _aclose(source: Any) -> None:
+    aclose = getattr(source, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _aiter(iterable: Any) -> AsyncIterator:
+    if hasattr(iterable, "__aiter__"):
+        try:
+            async for item in iterable:
+                yield item
+        finally:
+            await _aclose(iterable)
+    else:
+        for item in iterable:
+            yield item
+
+
+async def _amap(func: Callable[[Any], Awaitable], source: AsyncIterator, concurrency: int) -> AsyncIterator:
+    """
+    Await `func(item)` for up to `concurrency` items at once, yielding the results in source order.
+    :param func: A coroutine function, the I/O bound stage.
+    :param source: The stage before this one.
+    :param concurrency: The maximum number of `func` calls in flight; the bound on buffered results.
+    :return: yields func(item) for every item, in order
+    """
+    pending: deque[asyncio.Task] = deque()
+    try:
+        async for item in source:
+            pending.append(asyncio.ensure_future(func(item)))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # Closed early, or something blew up; do not leave orphaned tasks behind.
+        for task in pending:
+            task.cancel()
+        await _aclose(source)
+
+
+async def _afilter(predicate: Callable[[Any], Any], source: AsyncIterator) -> AsyncIterator:
+    try:
+        async for item in source:
+            verdict = predicate(item)
+            if inspect.isawaitable(verdict):
+                verdict = await verdict
+            if verdict:
+                yield item
+    finally:
+        await _aclose(source)
+
+
+async def _abatched(source: AsyncIterator, size: int) -> AsyncIterator[tuple]:
+    batch = []
+    try:
+        async for item in source:
+            batch.append(item)
+            if len(batch) == size:
+                yield tuple(batch)
+                batch = []
+        if batch:
+            yield tuple(batch)
+    finally:
+        await _aclose(source)
+
+
+async def _awindowed(source: AsyncIterator, size: int) -> AsyncIterator[tuple]:
+    window = deque(maxlen=size)
+    try:
+        async for item in source:
+            window.append(item)
+            if len(window) == size:
+                yield tuple(window)
+    finally:
+        await _aclose(source)
+
+
+class AsyncPipeline:
+    """
+    The async counterpart of generator_pipelines.Pipeline.  Stages are async generators, `map` accepts
+    coroutine functions and runs up to `concurrency` of them at a time so that their I/O overlaps, while
+    still handing results on in source order.
+    :param iterable: The source of the pipeline, a sync or async iterable.
+    """
+    def __init__(self, iterable: Any) -> None:
+        self.it = _aiter(iterable)
+
+    def map(self, func: Callable[[Any], Any], concurrency: int = 1) -> AsyncPipeline:
+        if not inspect.iscoroutinefunction(func):
+            plain = func
+
+            async def func(item):
+                # Plain functions, or lambdas returning a coroutine, are awaited only when necessary.
+                result = plain(item)
+                return await result if inspect.isawaitable(result) else result
+        self.it = _amap(func, self.it, concurrency)
+        return self
+
+    def filter(self, predicate: Callable[[Any], Any]) -> AsyncPipeline:
+        self.it = _afilter(predicate, self.it)
+        return self
+
+    def batch(self, size: int) -> AsyncPipeline:
+        self.it = _abatched(self.it, size)
+        return self
+
+    def window(self, size: int) -> AsyncPipeline:
+        self.it = _awindowed(self.it, size)
+        return self
+
+    def __aiter__(self) -> AsyncIterator:
+        return self.it
+
+    async def sink(self, consume: Callable[[Any], Any] | None = None) -> int:
+        return await drive(self.it, consume)
+
+
+def _fetch(item: int, latency: float) -> int:
+    time.sleep(latency)
+    return item
+
+
+async def _afetch(item: int, latency: float) -> int:
+    await asyncio.sleep(latency)
+    return item
+
+
+def overlapping_io_benchmark(items: int = 200, latency: float = 0.01, concurrency: tuple[int, ...] = (1, 10, 50)) -> None:
+    """
+    Compare a sync generator stage which blocks for `latency` per item against the async pipeline awaiting
+    the same simulated latency with increasing concurrency.  The sequential versions take roughly
+    items * latency, the concurrent ones roughly items * latency / concurrency.
+    :param items: The number of items to push through.
+    :param latency: The simulated I/O latency of each item, in seconds.
+    :param concurrency: The `map` concurrency levels to try.
+    :return: None
+    """
+    started = time.perf_counter()
+    for _ in (_fetch(item, latency) for item in range(items)):
+        pass
+    print(f"sync generator: {time.perf_counter() - started:.3f}s")
+
+    for limit in concurrency:
+        pipeline = AsyncPipeline(range(items)).map(lambda item: _afetch(item, latency), concurrency=limit)
+        started = time.perf_counter()
+        drained = asyncio.run(pipeline.sink())
+        print(f"async pipeline, concurrency {limit}: {drained} items in {time.perf_counter() - started:.3f}s")
@@ -0,0 +1,186 @@
+"""
+`no_keyerror_on_bad_lookup` in counter.py shows that looking up a key a Counter has never seen returns 0
+instead of raising a KeyError.  A Count-Min Sketch (Cormode & Muthukrishnan, 2005) answers lookups the
+same way, except it never stores the keys at all; memory is fixed up front, whatever the cardinality.
+
+The sketch is `depth` rows of `width` counters.  Every key hashes to one counter per row; counting a key
+adds to each of its counters and looking a key up returns the smallest of them.  Other keys colliding
+into the same counters can only ever add to them, so the answer over counts but never under counts.
+
+Note: Error bounds, with N the total of all counts added:
+    -> width = ceil(e / epsilon) and depth = ceil(ln(1 / delta)) guarantee that
+       true <= estimate <= true + epsilon * N, with probability at least 1 - delta.
+    -> `CountMinSketch.from_error(epsilon, delta)` sizes the sketch this way.
+
+Note: Conservative update only raises a keys counters as far as its new estimate requires, rather than
+adding to every one of them; this markedly reduces over counting for skewed streams.  It is only correct
+while counts go up though, so a conservative sketch refuses `subtract()`.  A plain sketch does support
+`subtract()`, but as with Counter negative counts then break the "never under counts" guarantee.
+
+Note: Throughput is bound by hashing, which happens once per distinct key of each batch.  Larger batches
+of a skewed stream therefore go a lot further than small batches of mostly unique keys.
+
+Note: Keys are hashed with blake2b over a stable encoding rather than with hash(), which is salted per
+process for str and bytes, so sketches built on different processes or machines can be merged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import operator
+import random
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from typing import Hashable
+from typing import Iterable
+
+
+def _key_bytes(key: Hashable) -> bytes:
+    if isinstance(key, str):
+        return b"s" + key.encode("utf-8")
+    if isinstance(key, (bytes, bytearray)):
+        return b"b" + bytes(key)
+    return b"r" + repr(key).encode("utf-8")
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 2 ** 16, depth: int = 5, conservative: bool = False, seed: int = 0) -> None:
+        """
+        :param width: The number of counters per row; the error shrinks as the width grows.
+        :param depth: The number of rows; the chance of exceeding the error shrinks as the depth grows.
+        :param conservative: Use conservative update, @see: the module notes.
+        :param seed: Sketches can only be merged with sketches built with the same seed.
+        """
+        self.width = width
+        self.depth = depth
+        self.conservative = conservative
+        self.seed = seed
+        self.total = 0
+        self.rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+        self._salt = seed.to_bytes(16, "little")
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float, **kwargs) -> CountMinSketch:
+        """
+        :param epsilon: Estimates exceed the true count by at most epsilon * N ...
+        :param delta: ... with probability at least 1 - delta.
+        """
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), **kwargs)
+
+    def _indices(self, key: Hashable) -> list[int]:
+        digest = hashlib.blake2b(_key_bytes(key), digest_size=16, salt=self._salt).digest()
+        # Kirsch & Mitzenmacher; two hashes are as good as `depth` independent ones, h1 + i * h2.
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def update(self, iterable: Iterable[Hashable] = ()) -> None:
+        """
+        Count every key of an iterable, or add the counts of a mapping of key -> count.
+        Iterables are first aggregated by a Counter (in C), so each distinct key of a batch is hashed once.
+        :param iterable: The keys to count, or a mapping of key -> count.  A conservative sketch only takes
+        counts above zero, @see: `subtract()`.
+        """
+        pairs = iterable.items() if hasattr(iterable, "items") else Counter(iterable).items()
+        if self.conservative and hasattr(iterable, "items") and any(count <= 0 for _, count in pairs):
+            # Checked up front, so a rejected mapping leaves the sketch as it was.
+            raise ValueError("a conservative update sketch only counts up, every count must be above zero")
+        rows = self.rows
+        for key, count in pairs:
+            self.total += count
+            indices = self._indices(key)
+            if self.conservative:
+                target = min(map(operator.getitem, rows, indices)) + count
+                for row, index in zip(rows, indices):
+                    if row[index] < target:
+                        row[index] = target
+            else:
+                for row, index in zip(rows, indices):
+                    row[index] += count
+
+    def subtract(self, iterable: Iterable[Hashable] = ()) -> None:
+        """
+        Take away every key of an iterable, or the counts of a mapping of key -> count.
+        :param iterable: The keys to take away, or a mapping of key -> count.
+        """
+        if self.conservative:
+            raise ValueError("a conservative update sketch cannot subtract")
+        pairs = iterable.items() if hasattr(iterable, "items") else Counter(iterable).items()
+        self.update({key: -count for key, count in pairs})
+
+    def __getitem__(self, key: Hashable) -> int:
+        return min(map(operator.getitem, self.rows, self._indices(key)))
+
+    def merge(self, *others: CountMinSketch) -> None:
+        """
+        Add the counters of other shards into this sketch, in place.  The result is exactly the sketch
+        which would have been built from all of the shards streams (for conservative sketches it is
+        still an over count, just a little looser than building it in one go).
+        :param others: Sketches of the same width, depth, seed and update flavour.
+        """
+        for other in others:
+            if (other.width, other.depth, other.seed, other.conservative) != (
+                self.width, self.depth, self.seed, self.conservative
+            ):
+                raise ValueError("only sketches of the same shape, seed and update flavour can be merged")
+            for row, other_row in zip(self.rows, other.rows):
+                row[:] = array("q", map(operator.add, row, other_row))
+            self.total += other.total
+
+    @property
+    def error_bound(self) -> float:
+        """
+        The most an estimate should exceed its true count by (with probability 1 - e ** -depth), e / width * N.
+        """
+        return math.e / self.width * self.total
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sum(row.__sizeof__() for row in self.rows)
+
+
+def count_min_sketch_benchmark(
+    cardinalities: tuple = (10_000, 100_000, 1_000_000), stream_length: int = 2_000_000, batch: int = 100_000
+) -> None:
+    """
+    Feed streams of growing cardinality into a Counter and a CountMinSketch, comparing the traced memory
+    held (constant for the sketch), throughput, and the average and worst over count of the sketch.
+    :param cardinalities: The number of distinct keys in each stream.
+    :param stream_length: The number of keys in each stream.
+    :param batch: The number of keys per `update` call.
+    :return: None
+    """
+    def fed(build, stream):
+        counter = build()
+        for offset in range(0, stream_length, batch):
+            counter.update(stream[offset:offset + batch])
+        return counter
+
+    for cardinality in cardinalities:
+        stream = [f"key{random.randrange(cardinality)}" for _ in range(stream_length)]
+        results = {}
+        for name, build in (("Counter", Counter), ("CountMinSketch", CountMinSketch)):
+            started = time.perf_counter()
+            results[name] = fed(build, stream)
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            counter = fed(build, stream)
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{cardinality} keys, {name}: {memory / 1048576:.2f}MB, {stream_length / elapsed:,.0f} keys/s")
+        exact, sketch = results["Counter"], results["CountMinSketch"]
+        errors = [sketch[key] - count for key, count in exact.items()]
+        print(f"    over count: mean {sum(errors) / len(errors):.2f}, worst {max(errors)}, bound {sketch.error_bound:.0f}")
+
+
+if __name__ == "__main__":
+    sketch = CountMinSketch(width=1024, depth=4)
+    sketch.update("abracadabra")
+    print(sketch["a"], sketch["z"])  # 5 0
+    shard = CountMinSketch(width=1024, depth=4)
+    shard.update({"a": 10})
+    sketch.merge(shard)
+    sketch.subtract("a")
+    print(sketch["a"])  # 14
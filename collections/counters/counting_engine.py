@@ -0,0 +1,140 @@
+"""
+A Counter is plenty fast for the examples in counter.py, but counting billions of tokens exposes where the
+time really goes.  `Counter(iterable)` and `c.update(iterable)` hand the iterable to a C helper,
+`_count_elements`, so the counting loop itself never runs as python bytecode.  The classic hand rolled
+version does not enjoy that:
+
+    c = Counter()
+    for token in tokens:
+        c[token] += 1  # a __getitem__ (with a __missing__ fallback) and a __setitem__ per token
+
+Note: The engine below therefore does three things:
+    -> Feeds whole batches (chunks) to `Counter.update` so every token is counted by the C loop.
+    -> Counts chunks in worker threads or processes, each producing a small partial Counter.
+    -> Merges partial Counters with `update(mapping)`, which costs one step per distinct key not per token.
+
+Note: Partial Counters are merged with `update()` and NOT with `+`.  `c1 + c2` silently drops every key
+whose count is zero or negative, whereas `update()` simply adds the counts together, keeping zero and
+negative counts exactly like `subtract()` does.
+
+As CountingEngine is a Counter subclass `most_common`, `elements`, `subtract`, the "no KeyError, returns 0"
+lookups and all the zero / negative count behaviour documented in counter.py are untouched.
+"""
+
+import itertools
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterable[list]:
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def _count_chunk(chunk: list) -> Counter:
+    return Counter(chunk)
+
+
+class CountingEngine(Counter):
+    def update_batches(self, batches: Iterable[Iterable]) -> None:
+        """
+        Count an iterable of batches (lists, tuples, any iterable of tokens), one C level update per batch.
+        :param batches: The batches of tokens to count.
+        """
+        update = super().update
+        for batch in batches:
+            update(batch)
+
+    def update_chunked(self, iterable: Iterable, chunk_size: int = 65_536) -> None:
+        """
+        Count a (possibly unbounded) stream of tokens, `chunk_size` tokens at a time.
+        :param iterable: The tokens to count.
+        :param chunk_size: The number of tokens pulled from `iterable` per update.
+        """
+        self.update_batches(_chunks(iterable, chunk_size))
+
+    def merge(self, *partials: Counter) -> None:
+        """
+        Add the counts of every partial Counter into this one, keeping zero and negative counts.
+        :param partials: Counters (or any mapping of key -> count) to merge in.
+        """
+        update = super().update
+        for partial in partials:
+            update(partial)
+
+    @classmethod
+    def from_parallel(
+        cls, iterable: Iterable, workers: int = 4, chunk_size: int = 262_144, processes: bool = True
+    ) -> "CountingEngine":
+        """
+        Count `iterable` in chunks across a pool of workers, merging each partial Counter as it completes.
+        At most 2 * workers chunks are held in memory at once, so unbounded streams are fine.
+
+        Note: Threads only help when producing the tokens releases the GIL (reading files, decompressing);
+        the counting itself holds it.  Processes count truly in parallel but every chunk is pickled across,
+        which only pays off when the number of distinct keys per chunk is small relative to its length.
+        :param iterable: The tokens to count.
+        :param workers: The size of the pool.
+        :param chunk_size: The number of tokens sent to a worker at a time.
+        :param processes: Use a ProcessPoolExecutor, otherwise a ThreadPoolExecutor.
+        :return: A CountingEngine holding the merged counts.
+        """
+        engine = cls()
+        pool_type = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        chunks = _chunks(iterable, chunk_size)
+        with pool_type(max_workers=workers) as pool:
+            in_flight = [pool.submit(_count_chunk, chunk) for chunk in itertools.islice(chunks, 2 * workers)]
+            while in_flight:
+                engine.merge(in_flight.pop(0).result())
+                for chunk in itertools.islice(chunks, 1):
+                    in_flight.append(pool.submit(_count_chunk, chunk))
+        return engine
+
+
+def counting_engine_benchmark(tokens: int = 10_000_000, vocabulary: int = 50_000, workers: int = 4) -> None:
+    """
+    Count the same tokens by hand, with a single Counter, in batches, and across a process pool.
+    :param tokens: The number of tokens to count.
+    :param vocabulary: The number of distinct tokens.
+    :param workers: The number of processes for the parallel run.
+    :return: None
+    """
+    words = [f"token{i}" for i in range(vocabulary)]
+    stream = random.choices(words, k=tokens)
+
+    def by_hand():
+        c = Counter()
+        for token in stream:
+            c[token] += 1
+        return c
+
+    def batched():
+        engine = CountingEngine()
+        engine.update_chunked(stream)
+        return engine
+
+    runs = (
+        ("c[token] += 1", by_hand),
+        ("Counter(tokens)", lambda: Counter(stream)),
+        ("update_chunked", batched),
+        (f"from_parallel({workers} processes)", lambda: CountingEngine.from_parallel(stream, workers)),
+    )
+    expected = None
+    for name, run in runs:
+        started = time.perf_counter()
+        counted = run()
+        elapsed = time.perf_counter() - started
+        expected = expected or counted
+        print(f"{name}: {elapsed:.2f}s ({tokens / elapsed:,.0f} tokens/s), matches: {counted == expected}")
+
+
+if __name__ == "__main__":
+    engine = CountingEngine.from_parallel("abracadabra", workers=2, chunk_size=3)
+    engine.subtract("aaaaaaa")
+    print(engine.most_common())  # [('b', 2), ('r', 2), ('c', 1), ('d', 1), ('a', -2)]
+    print(list(engine.elements()))  # ['b', 'b', 'r', 'r', 'c', 'd']
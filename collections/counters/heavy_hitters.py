@@ -0,0 +1,187 @@
+"""
+`counter_most_common` in counter.py calls `most_common(n)` on a fully materialised Counter, one entry for
+every distinct key ever seen.  With 50 million distinct keys and only the top 100 wanted, that table is
+almost entirely wasted memory.
+
+The Space-Saving algorithm (Metwally, Agrawal & El Abbadi, 2005) keeps at most `capacity` counters:
+    -> A key already being counted has its counter incremented.
+    -> A new key takes a free counter if there is one.
+    -> Otherwise the key with the smallest count is evicted, and the new key inherits that smallest count
+       (plus one), remembering the inherited amount as its `error`.
+
+Note: Error bounds, with N the total of all counts seen and capacity the number of counters:
+    -> Every estimate over counts, never under counts; true <= estimate <= true + N / capacity.
+    -> `estimate - error` is a guaranteed lower bound for the true count.
+    -> Any key whose true count exceeds N / capacity is guaranteed to be held.
+So to find the keys above 0.1% of the stream, capacity 1000 is enough, whatever the number of distinct keys.
+
+Note: Unlike a Counter, counts are never zero or negative (there is no `subtract`), and looking up a key
+that is not held returns 0 rather than raising a KeyError; its true count is anywhere up to `min_count`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import time
+import tracemalloc
+from collections import Counter
+from operator import itemgetter
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int) -> None:
+        """
+        :param capacity: The maximum number of keys counted at any one time; memory is O(capacity).
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # A lazy min-heap of (count, tiebreak, key); stale entries are skipped, and the heap is rebuilt
+        # before it can grow past a small multiple of capacity.
+        self._heap = []
+        self._tiebreak = itertools.count()
+
+    def update(self, iterable: Iterable[Hashable] = ()) -> None:
+        """
+        Count every key of an iterable, or add the weights of a mapping of key -> count, like Counter.update.
+        :param iterable: The keys to count, or a mapping of key -> positive count.
+        """
+        if hasattr(iterable, "items"):
+            pairs = iterable.items()
+            if any(weight <= 0 for _, weight in pairs):
+                # Checked up front, so a rejected mapping counts nothing at all.
+                raise ValueError("SpaceSaving only counts up, every count must be above zero")
+        else:
+            pairs = zip(iterable, itertools.repeat(1))
+        for key, weight in pairs:
+            self._add(key, weight)
+
+    def _add(self, key: Hashable, weight: int) -> None:
+        self.total += weight
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+        elif len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0
+        else:
+            evicted, minimum = self._pop_min()
+            del counts[evicted], self.errors[evicted]
+            counts[key] = minimum + weight
+            self.errors[key] = minimum
+        heapq.heappush(self._heap, (counts[key], next(self._tiebreak), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild()
+
+    def _pop_min(self) -> tuple:
+        heap, counts = self._heap, self.counts
+        while True:
+            count, _, key = heapq.heappop(heap)
+            if counts.get(key) == count:
+                return key, count
+
+    def _rebuild(self) -> None:
+        self._heap = [(count, next(self._tiebreak), key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def __getitem__(self, key: Hashable) -> int:
+        return self.counts.get(key, 0)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.counts)
+
+    def most_common(self, n: int | None = None) -> list:
+        """
+        :param n: The number of (key, estimated count) pairs to return, all of them when None or omitted.
+        :return: A list of (key, estimated count) pairs, most common first, like Counter.most_common.
+        """
+        if n is None:
+            return sorted(self.counts.items(), key=itemgetter(1), reverse=True)
+        return heapq.nlargest(n, self.counts.items(), key=itemgetter(1))
+
+    def guaranteed(self, key: Hashable) -> int:
+        """
+        :return: A lower bound for the true count of key, 0 for keys which are not held.
+        """
+        return self.counts.get(key, 0) - self.errors.get(key, 0)
+
+    @property
+    def min_count(self) -> int:
+        """
+        The smallest count held; the most any key which is not held could have been seen.
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    @property
+    def error_bound(self) -> float:
+        """
+        The most any estimate can exceed its true count by, N / capacity.
+        """
+        return self.total / self.capacity
+
+
+def heavy_hitters_benchmark(
+    stream_length: int = 5_000_000, distinct: int = 1_000_000, k: int = 100, capacities: tuple = (100, 1_000, 10_000)
+) -> None:
+    """
+    Compare the top `k` of a zipf distributed stream from SpaceSaving, at various capacities, against an
+    exact Counter; recall of the true top k, the worst over count among them, and the traced memory held.
+    :param stream_length: The number of keys in the stream.
+    :param distinct: The number of distinct keys in the stream.
+    :param k: The size of the top k compared.
+    :param capacities: The SpaceSaving capacities to try.
+    :return: None
+    """
+    weights = [1 / rank for rank in range(1, distinct + 1)]
+    stream = random.choices(range(distinct), weights=weights, k=stream_length)
+
+    def measure(build):
+        started = time.perf_counter()
+        build()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        counter = build()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return counter, elapsed, memory
+
+    exact, elapsed, memory = measure(lambda: Counter(stream))
+    truth = exact.most_common(k)
+    print(f"Counter: {len(exact)} keys, {memory / 1048576:.1f}MB, {elapsed:.2f}s")
+    for capacity in capacities:
+        def build():
+            sketch = SpaceSaving(capacity)
+            sketch.update(stream)
+            return sketch
+
+        sketch, elapsed, memory = measure(build)
+        found = {key for key, _ in sketch.most_common(k)}
+        recall = sum(key in found for key, _ in truth) / k
+        worst = max(sketch[key] - count for key, count in truth)
+        print(
+            f"SpaceSaving({capacity}): {memory / 1048576:.2f}MB, {elapsed:.2f}s, top {k} recall {recall:.0%}, "
+            f"worst over count {worst} (bound {sketch.error_bound:,.0f})"
+        )
+
+
+if __name__ == "__main__":
+    sketch = SpaceSaving(3)
+    sketch.update("abracadabra")
+    print(sketch.most_common(2))  # [('a', 5), ('b', 3)]
+    print(sketch.guaranteed("a"), sketch.error_bound)  # 5 3.6666666666666665
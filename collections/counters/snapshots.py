@@ -0,0 +1,270 @@
+"""
+Aggregating Counters across many nodes usually means pickling each Counter, shipping it, unpickling it and
+folding it in with `update()`.  Pickle has to describe every key and every count as an individual object,
+and folding in a whole unpickled Counter holds all of it in memory at once.
+
+A snapshot is a compact binary file of a Counters state instead; its keys sorted, in blocks of:
+    -> the number of entries and the byte size of all of their keys, as two unsigned 32 bit ints
+    -> the length of every key, as unsigned 32 bit ints (in characters for str keys)
+    -> the keys themselves (utf-8 for str keys), back to back
+    -> the counts, as signed 64 bit ints
+Every int is little endian, so a snapshot reads back the same on any machine.
+
+Because every snapshot is sorted, any number of them can be merged by a k-way merge (`heapq.merge`),
+reading a block at a time from each and writing a block at a time, so memory is bounded by the block size
+times the number of snapshots rather than by the number of keys.
+
+Note: Counts are summed exactly as `Counter.update()` and `Counter.subtract()` would, zero and negative
+counts are kept.  (`c1 + c2` on the other hand drops them, @see: counting_engine.py.)
+
+Note: Keys must all be str, or all be bytes, and counts must fit in a signed 64 bit integer.  A snapshot is
+written beside its path and only moved into place once complete, so a failed write never leaves a truncated
+snapshot behind (nor clobbers the one already there).
+
+Note: pickle is implemented in C and, when everything fits in memory, dumps and loads a Counter faster
+than this pure python format (@see: `snapshot_benchmark()`).  What snapshots buy is the merge; combining
+unpickled Counters peaks at the size of the combined Counter, merging snapshots peaks at a few blocks.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from typing import BinaryIO
+from typing import Iterable
+from typing import Iterator
+
+MAGIC = b"CSNP\x01"
+_KINDS = {b"s": str, b"b": bytes}
+_BLOCK = struct.Struct("<II")
+# array's typecodes are native; "I" is 32 bits on every platform CPython supports, and "q" is always 64.
+_LENGTH, _COUNT = "I", "q"
+_SWAP = sys.byteorder != "little"
+
+
+def _packed(typecode: str, values: Iterable[int]) -> bytes:
+    packed = array(typecode, values)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpacked(typecode: str, data: bytes) -> array:
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if _SWAP:
+        unpacked.byteswap()
+    return unpacked
+
+
+def _write_blocks(f: BinaryIO, items: Iterable[tuple], kind: type, block_size: int) -> int:
+    written = 0
+    it = iter(items)
+    while block := list(itertools.islice(it, block_size)):
+        keys = [key for key, _ in block]
+        # str keys are joined and encoded in one go, their lengths are counted in characters.
+        blob = "".join(keys).encode() if kind is str else b"".join(keys)
+        f.write(_BLOCK.pack(len(block), len(blob)))
+        f.write(_packed(_LENGTH, map(len, keys)))
+        f.write(blob)
+        f.write(_packed(_COUNT, [count for _, count in block]))
+        written += len(block)
+    f.write(_BLOCK.pack(0, 0))
+    return written
+
+
+def _read_blocks(f: BinaryIO, kind: type) -> Iterator[list[tuple]]:
+    while True:
+        size, blob_size = _BLOCK.unpack(f.read(_BLOCK.size))
+        if not size:
+            return
+        lengths = _unpacked(_LENGTH, f.read(size * 4))
+        blob = f.read(blob_size)
+        if kind is str:
+            # Decoded once per block, rather than once per key.
+            blob = blob.decode()
+        counts = _unpacked(_COUNT, f.read(size * 8))
+        ends = list(itertools.accumulate(lengths))
+        yield list(zip(map(blob.__getitem__, map(slice, [0] + ends, ends)), counts))
+
+
+def write_snapshot(counter: Counter, path: str, block_size: int = 16_384) -> int:
+    """
+    Write the state of a Counter to a snapshot file.
+    :param counter: The Counter (or any mapping of key -> int) to snapshot, keys all str or all bytes.
+    :param path: The file to write.
+    :param block_size: The number of entries per block.
+    :return: The number of keys written.
+    """
+    kind = bytes if counter and isinstance(next(iter(counter)), bytes) else str
+    if not all(isinstance(key, kind) for key in counter):
+        raise TypeError("snapshot keys must all be str or all be bytes")
+    return _write_file(path, sorted(counter.items()), kind, block_size)
+
+
+def _write_file(path: str, items: Iterable[tuple], kind: type, block_size: int) -> int:
+    partial = path + ".partial"
+    try:
+        with open(partial, "wb") as f:
+            f.write(MAGIC + (b"b" if kind is bytes else b"s"))
+            written = _write_blocks(f, items, kind, block_size)
+    except BaseException:
+        os.remove(partial)
+        raise
+    os.replace(partial, path)
+    return written
+
+
+def _open(path: str) -> tuple[BinaryIO, type]:
+    f = open(path, "rb")
+    header = f.read(len(MAGIC) + 1)
+    if header[:-1] != MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a Counter snapshot")
+    return f, _KINDS[header[-1:]]
+
+
+def iter_snapshot(path: str) -> Iterator[tuple[str | bytes, int]]:
+    """
+    Stream the (key, count) pairs of a snapshot in key order, one block in memory at a time.
+    :param path: The snapshot to read.
+    :return: yields (key, count) pairs
+    """
+    f, kind = _open(path)
+    with f:
+        for block in _read_blocks(f, kind):
+            yield from block
+
+
+def read_snapshot(path: str) -> Counter:
+    """
+    :param path: The snapshot to read.
+    :return: A Counter of the snapshots state.
+    """
+    counter = Counter()
+    f, kind = _open(path)
+    with f:
+        for block in _read_blocks(f, kind):
+            # Keys are unique within a snapshot, so plain dict.update is safe and skips Counter's addition.
+            dict.update(counter, block)
+    return counter
+
+
+def merge_snapshots(paths: Iterable[str], out_path: str, block_size: int = 16_384) -> int:
+    """
+    k-way merge any number of snapshots into a new one, summing the counts of equal keys.
+    :param paths: The snapshots to merge, all holding the same kind of key.
+    :param out_path: The snapshot file to write.
+    :param block_size: The number of entries per block written.
+    :return: The number of distinct keys written.
+    """
+    paths = list(paths)
+    kinds = set()
+    for path in paths:
+        f, kind = _open(path)
+        f.close()
+        kinds.add(kind)
+    if len(kinds) > 1:
+        raise ValueError("cannot merge snapshots of str keys with snapshots of bytes keys")
+    kind = kinds.pop() if kinds else str
+
+    def summed():
+        # (key, count) tuples sort by key first, so heapq.merge needs no key function.
+        merged = heapq.merge(*map(iter_snapshot, paths))
+        previous, total = next(merged, (None, 0))
+        for key, count in merged:
+            if key == previous:
+                total += count
+            else:
+                yield previous, total
+                previous, total = key, count
+        if previous is not None:
+            yield previous, total
+
+    return _write_file(out_path, summed(), kind, block_size)
+
+
+def snapshot_benchmark(keys: int = 10_000_000, shards: int = 4) -> None:
+    """
+    Compare pickle against snapshots for a Counter of `keys` keys; file size, dump and load time, and
+    combining `shards` overlapping shards (unpickle + update vs merge_snapshots).
+    :param keys: The number of keys in the Counter.
+    :param shards: The number of shards to combine.
+    :return: None
+    """
+    counter = Counter({f"key{i}": i % 1000 - 10 for i in range(keys)})
+    directory = tempfile.mkdtemp()
+    pickled, snapshot = os.path.join(directory, "counter.pickle"), os.path.join(directory, "counter.snap")
+
+    started = time.perf_counter()
+    with open(pickled, "wb") as f:
+        pickle.dump(counter, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"pickle dump: {time.perf_counter() - started:.2f}s, {os.path.getsize(pickled) / 1048576:.1f}MB")
+    started = time.perf_counter()
+    write_snapshot(counter, snapshot)
+    print(f"snapshot write: {time.perf_counter() - started:.2f}s, {os.path.getsize(snapshot) / 1048576:.1f}MB")
+
+    started = time.perf_counter()
+    with open(pickled, "rb") as f:
+        pickle.load(f)
+    print(f"pickle load: {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    read_snapshot(snapshot)
+    print(f"snapshot read: {time.perf_counter() - started:.2f}s")
+
+    # Each shard holds every other key, offset by its index, so shards overlap.
+    shard_paths = []
+    for index in range(shards):
+        shard = Counter(dict(itertools.islice(counter.items(), index, None, 2)))
+        path = os.path.join(directory, f"shard{index}")
+        with open(path + ".pickle", "wb") as f:
+            pickle.dump(shard, f, protocol=pickle.HIGHEST_PROTOCOL)
+        write_snapshot(shard, path + ".snap")
+        shard_paths.append(path)
+    del counter
+
+    def pickle_combine():
+        combined = Counter()
+        for path in shard_paths:
+            with open(path + ".pickle", "rb") as f:
+                combined.update(pickle.load(f))
+
+    def snapshot_merge():
+        merge_snapshots([path + ".snap" for path in shard_paths], os.path.join(directory, "merged.snap"))
+
+    for name, combine in (("pickle combine", pickle_combine), ("snapshot merge", snapshot_merge)):
+        started = time.perf_counter()
+        combine()
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        combine()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name} {shards} shards: {elapsed:.2f}s, peak {peak / 1048576:.1f}MB")
+
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    one, two, out = (os.path.join(directory, name) for name in ("one", "two", "out"))
+    write_snapshot(Counter(a=1, b=2, c=0), one)
+    shard = Counter(b=1)
+    shard.subtract("aa")
+    write_snapshot(shard, two)
+    merge_snapshots([one, two], out)
+    print(read_snapshot(out))  # Counter({'b': 3, 'c': 0, 'a': -1})
+    for path in (one, two, out):
+        os.remove(path)
+    os.rmdir(directory)
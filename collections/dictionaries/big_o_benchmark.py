@@ -0,0 +1,205 @@
+"""
+dictionary.py tabulates the cost of dict operations in terms of Big-O, without ever measuring them:
+
+| Operation   | Average Case | Worst Case |
+|-------------|--------------|------------|
+| Copy        | O(N)         | O(N)       |
+| Get         | O(1)         | O(N)       |
+| Set         | O(1)         | O(N)       |
+| Delete      | O(1)         | O(N)       |
+| Instantiate | O(N)         | O(N)       |
+
+This harness measures each of them across dict sizes, and fits the empirical complexity; if time grows as
+N ** k, then log(time) against log(N) is a straight line of slope k.  A slope near 0 is O(1), near 1 is O(N).
+Copy and Instantiate are timed as a whole, Get, Set and Delete per operation.
+
+    -> The average case uses int keys, which hash (to themselves) without colliding.
+    -> The worst case uses Colliding keys; like `OnlyHash` in dunder_methods/dunder_hash.py they implement
+       __hash__ themselves, except every one of them returns the same hash, so every lookup has to walk
+       (and __eq__ compare) every key inserted before it.
+
+Results are written as JSON, along with the python version and platform, so that a run on one version of
+python can be compared against a run on another; `compare()` reports every operation whose slope, or time
+at the largest size, moved by more than a tolerance.
+
+Note: The worst case of Instantiate is O(N) per key, O(N ** 2) for the dict, which the table glosses over;
+the fit shows a slope near 2.  Copy stays O(N) even then, a dict with no deleted keys is copied table and
+all, without hashing anything again.
+
+Note: The O(1) operations still fit a small positive slope (0.1 - 0.2) over the larger sizes; a bigger
+table means more cache misses per lookup, which Big-O does not model.
+
+Note: Sizes up to 1e7 need a few GB of memory for the average case; the worst case is quadratic to build
+and so runs over far smaller sizes.  Timings on a busy machine are noisy, the best of `repeat` runs is kept.
+"""
+
+from __future__ import annotations
+
+import gc
+import itertools
+import json
+import math
+import platform
+import random
+import sys
+import time
+from collections import deque
+from typing import Callable
+
+TABLE = {
+    "average": {"copy": 1, "get": 0, "set": 0, "delete": 0, "instantiate": 1},
+    "worst": {"copy": 1, "get": 1, "set": 1, "delete": 1, "instantiate": 1},
+}
+
+
+class Colliding:
+    __slots__ = ("value",)
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __hash__(self) -> int:
+        return 42
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Colliding) and other.value == self.value
+
+
+def _best(trial: Callable[[], float], repeat: int) -> float:
+    """
+    :param trial: Runs the operation once, returning the seconds it took (so any setup or restore is untimed).
+    :return: The quickest of `repeat` trials, with the garbage collector off as timeit does.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return min(trial() for _ in range(repeat))
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _measure(make_key: Callable[[int], object], size: int, sample: int, repeat: int) -> dict[str, float]:
+    """
+    :return: The seconds taken by every operation for a dict of `size` keys; copy and instantiate for the
+    whole dict, get, set and delete per operation (averaged over `sample` operations).
+    """
+    keys = [make_key(i) for i in range(size)]
+    d = dict.fromkeys(keys)
+    chosen = random.sample(keys, min(size, sample))
+    fresh = [make_key(size + i) for i in range(len(chosen))]
+    # deque(..., maxlen=0) drives the map from C, so the loop overhead does not swamp O(1) operations.
+    consume = deque(maxlen=0).extend
+
+    def timed(operation: Callable[[], object]) -> Callable[[], float]:
+        def trial() -> float:
+            started = time.perf_counter()
+            operation()
+            return time.perf_counter() - started
+        return trial
+
+    def mutating(method: str, keys: list) -> Callable[[], float]:
+        def trial() -> float:
+            # Each trial mutates its own copy; restoring the original would reorder its colliding keys.
+            target = d.copy()
+            started = time.perf_counter()
+            consume(map(getattr(target, method), keys, itertools.repeat(None)))
+            return time.perf_counter() - started
+        return trial
+
+    return {
+        "copy": _best(timed(d.copy), repeat),
+        "get": _best(timed(lambda: consume(map(d.__getitem__, chosen))), repeat) / len(chosen),
+        "set": _best(mutating("__setitem__", fresh), repeat) / len(fresh),
+        "delete": _best(mutating("pop", chosen), repeat) / len(chosen),
+        "instantiate": _best(timed(lambda: dict(zip(keys, keys))), repeat),
+    }
+
+
+def fit_slope(sizes: list[int], seconds: list[float]) -> float:
+    """
+    Least squares fit of log(seconds) against log(size).
+    :return: The slope, k in time ~ N ** k.
+    """
+    xs, ys = [math.log(size) for size in sizes], [math.log(max(second, 1e-12)) for second in seconds]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def big_o_benchmark(
+    sizes: tuple = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7),
+    colliding_sizes: tuple = (100, 200, 400, 800, 1600),
+    sample: int = 10_000,
+    repeat: int = 5,
+    path: str | None = None,
+) -> dict:
+    """
+    Measure every operation of the table for both cases, printing the fitted slopes against the table.
+    :param sizes: The dict sizes of the average case.
+    :param colliding_sizes: The dict sizes of the worst case.
+    :param sample: The (maximum) number of operations timed per get / set / delete.
+    :param repeat: The number of trials per measurement, the quickest is kept.
+    :param path: If given, the results are written to this file as JSON.
+    :return: The results.
+    """
+    results = {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cases": {},
+    }
+    for case, make_key, case_sizes in (("average", int, sizes), ("worst", Colliding, colliding_sizes)):
+        timings = [_measure(make_key, size, sample, repeat) for size in case_sizes]
+        operations = {}
+        for operation, expected in TABLE[case].items():
+            seconds = [timing[operation] for timing in timings]
+            slope = fit_slope(list(case_sizes), seconds)
+            operations[operation] = {"sizes": list(case_sizes), "seconds": seconds, "slope": slope}
+            print(f"{case} {operation}: slope {slope:.2f} (table says O(N ** {expected})), {seconds[-1]:.3g}s at {case_sizes[-1]}")
+        results["cases"][case] = operations
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+def compare(baseline: dict | str, current: dict | str, slope_tolerance: float = 0.25, slowdown: float = 1.5) -> list[str]:
+    """
+    Compare two sets of results, from `big_o_benchmark()` or the JSON files it wrote.
+    :param baseline: The results to compare against.
+    :param current: The new results.
+    :param slope_tolerance: Report any slope which moved by more than this.
+    :param slowdown: Report any operation this many times slower at the largest size both runs measured.
+    :return: A message per regression found, empty if none.
+    """
+    loaded = []
+    for results in (baseline, current):
+        if isinstance(results, str):
+            with open(results) as f:
+                results = json.load(f)
+        loaded.append(results)
+    baseline, current = loaded
+    regressions = []
+    for case, operations in current["cases"].items():
+        for operation, now in operations.items():
+            before = baseline["cases"].get(case, {}).get(operation)
+            if before is None:
+                continue
+            name = f"{case} {operation} ({baseline['python']} -> {current['python']})"
+            if abs(now["slope"] - before["slope"]) > slope_tolerance:
+                regressions.append(f"{name}: slope {before['slope']:.2f} -> {now['slope']:.2f}")
+            common = set(now["sizes"]) & set(before["sizes"])
+            if common:
+                size = max(common)
+                then = before["seconds"][before["sizes"].index(size)]
+                this = now["seconds"][now["sizes"].index(size)]
+                if this > slowdown * then:
+                    regressions.append(f"{name}: {this / then:.1f}x slower at {size}")
+    return regressions
+
+
+if __name__ == "__main__":
+    print(fit_slope([10, 100, 1000], [1, 10, 100]), fit_slope([10, 100, 1000], [3, 3, 3]))  # 1.0 0.0
+    print(len({Colliding(1), Colliding(1), Colliding(2)}), hash(Colliding(1)) == hash(Colliding(2)))  # 2 True
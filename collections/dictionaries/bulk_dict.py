@@ -0,0 +1,117 @@
+"""
+dictionary.py documents `get()`, `setdefault()` and `update()`, each called once per key.  A hot path
+doing thousands of lookups in a python loop pays, for every key, for the loop itself, the attribute lookup
+of `d.get` and the call; the hash table lookup is the cheap part.
+
+BulkDict is a dict with bulk variants which take a whole sequence of keys (a list, a tuple, an array, any
+iterable) in one call, driving the per key work from C via `map()`:
+    -> `get_many(keys, default)` returns a list of values (or an array of them, given a typecode)
+    -> `update_many(keys, values)` sets every key to its value, pairwise
+    -> `setdefault_many(keys, default)` sets every missing key to default, returning every keys value
+
+    >>> d = BulkDict(a=1, b=2)
+    >>> d.get_many(["a", "b", "z"])
+    [1, 2, None]
+
+Note: The gain is the interpreter overhead per key, not the lookup; expect tens of percent over a
+comprehension, not multiples, @see: `bulk_dict_benchmark()`.  `operator.itemgetter(*keys)(d)` is quicker
+still for keys which are all known to exist, but raises a KeyError on the first one missing.
+
+Note: As BulkDict is a dict subclass, everything else (`in`, the views, `d[key]`) runs at full dict speed.
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from itertools import repeat
+from typing import Any
+from typing import Hashable
+from typing import Iterable
+
+
+class BulkDict(dict):
+    def get_many(self, keys: Iterable[Hashable], default: Any = None, typecode: str | None = None) -> list | array:
+        """
+        :param keys: The keys to look up.
+        :param default: The value of every key which is missing.
+        :param typecode: If given, the values are returned packed in an array of this typecode.
+        :return: The value of every key, in order.
+        """
+        if default is None:
+            values = map(self.get, keys)
+        else:
+            values = map(self.get, keys, repeat(default))
+        return list(values) if typecode is None else array(typecode, values)
+
+    def update_many(self, keys: Iterable[Hashable], values: Iterable[Any]) -> None:
+        """
+        Set every key to its value, pairwise; as `update()`, later duplicates win.
+        :param keys: The keys to set.
+        :param values: The value of each key.
+        """
+        self.update(zip(keys, values))
+
+    def setdefault_many(self, keys: Iterable[Hashable], default: Any = None) -> list:
+        """
+        :param keys: The keys to set to default, where missing.
+        :param default: The value set for every missing key (the same object for all of them).
+        :return: The value of every key, in order, after setting.
+        """
+        return list(map(self.setdefault, keys, repeat(default)))
+
+
+def bulk_dict_benchmark(size: int = 1_000_000, batch: int = 10_000, rounds: int = 200) -> None:
+    """
+    Time `rounds` batches of `batch` operations against a BulkDict of `size` str keys, half of the looked up
+    keys missing; a for loop, a comprehension and the bulk API for get, update and setdefault.
+    :param size: The number of keys in the dict.
+    :param batch: The number of keys per batch, as in one request.
+    :param rounds: The number of batches timed.
+    :return: None
+    """
+    d = BulkDict((f"key{i}", i) for i in range(size))
+    keys = [f"key{i}" for i in range(0, 2 * size, 2 * size // batch)][:batch]
+    values = list(range(batch))
+
+    def get_loop():
+        out = []
+        for key in keys:
+            out.append(d.get(key, 0))
+        return out
+
+    def update_loop():
+        for key, value in zip(keys, values):
+            d[key] = value
+
+    def setdefault_loop():
+        out = []
+        for key in keys:
+            out.append(d.setdefault(key, 0))
+        return out
+
+    cases = (
+        ("get, for loop", get_loop),
+        ("get, comprehension", lambda: [d.get(key, 0) for key in keys]),
+        ("get, get_many", lambda: d.get_many(keys, 0)),
+        ("get, get_many(typecode='q')", lambda: d.get_many(keys, 0, typecode="q")),
+        ("update, for loop", update_loop),
+        ("update, comprehension", lambda: d.update({key: value for key, value in zip(keys, values)})),
+        ("update, update_many", lambda: d.update_many(keys, values)),
+        ("setdefault, for loop", setdefault_loop),
+        ("setdefault, comprehension", lambda: [d.setdefault(key, 0) for key in keys]),
+        ("setdefault, setdefault_many", lambda: d.setdefault_many(keys, 0)),
+    )
+    for name, case in cases:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            case()
+        elapsed = time.perf_counter() - started
+        print(f"{name}: {elapsed / rounds * 1e6:,.0f}us per batch of {batch}")
+
+
+if __name__ == "__main__":
+    d = BulkDict(a=1, b=2)
+    print(d.get_many(["a", "b", "z"]), d.get_many("abz", 0, typecode="q"))  # [1, 2, None] array('q', [1, 2, 0])
+    d.update_many("xy", [24, 25])
+    print(d.setdefault_many("axz", 0), d)  # [1, 24, 0] {'a': 1, 'b': 2, 'x': 24, 'y': 25, 'z': 0}
@@ -0,0 +1,177 @@
+"""
+Note 6 in dictionary.py; deleting keys never makes a dict smaller.  A deleted entry becomes a dummy, kept
+around so that probing for other keys which collided with it still works, and the table stays the size it
+was at its biggest.  CPython only rebuilds the table when an insert finds it full, sizing the new one from
+the live entries, which is when the dummies finally go away.
+
+For a long running cache which fills up, then has most of its keys evicted, that means holding on to the
+memory of its busiest moment indefinitely:
+
+    >>> d = dict.fromkeys(range(1_000_000))
+    >>> sys.getsizeof(d)
+    41943128
+    >>> for key in range(990_000):
+    ...     del d[key]
+    >>> sys.getsizeof(d)  # 10,000 entries, still the table of a million
+    41943128
+    >>> sys.getsizeof(dict(d))
+    294992
+
+CompactingDict wraps a dict, keeping a tally of the deletes made since the table was last rebuilt, and
+copies itself into a fresh, right sized dict as soon as those dummies make up more than `threshold` of the
+entries.  `stats()` exposes the live / deleted tallies and the current size for monitoring.
+
+Note: The tally of dummies is an estimate; CPython does not expose the real number.  Every insert checks
+whether `sys.getsizeof` changed, which means CPython resized (and so purged its dummies) by itself.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import MutableMapping
+from typing import Any
+from typing import Hashable
+from typing import Iterator
+
+
+class CompactingDict(MutableMapping):
+    def __init__(self, *args, threshold: float = 0.5, min_size: int = 1024, **kwargs) -> None:
+        """
+        :param threshold: Rebuild once deleted entries exceed this fraction of live + deleted entries.
+        :param min_size: Never bother rebuilding while live + deleted entries are fewer than this.
+        """
+        self.threshold = threshold
+        self.min_size = min_size
+        self._data = dict(*args, **kwargs)
+        self._deleted = 0
+        self._rebuilds = 0
+        self._size = sys.getsizeof(self._data)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        size = sys.getsizeof(self._data)
+        if size != self._size:
+            # CPython resized the table itself, dropping every dummy entry along the way.
+            self._size = size
+            self._deleted = 0
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._data[key]
+        self._tally_delete()
+
+    def pop(self, key: Hashable, *default: Any) -> Any:
+        if key not in self._data:
+            return self._data.pop(key, *default)
+        value = self._data.pop(key)
+        self._tally_delete()
+        return value
+
+    def popitem(self) -> tuple[Hashable, Any]:
+        # dict.popitem() takes the last entry directly, rather than MutableMapping's iterate and delete.
+        item = self._data.popitem()
+        self._tally_delete()
+        return item
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._deleted = 0
+        self._size = sys.getsizeof(self._data)
+
+    def _tally_delete(self) -> None:
+        self._deleted += 1
+        entries = len(self._data) + self._deleted
+        if entries >= self.min_size and self._deleted > self.threshold * entries:
+            self.compact()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def compact(self) -> None:
+        """
+        Rebuild the underlying dict at the size fitting its live entries, dropping every dummy entry.
+        """
+        self._data = dict(self._data)
+        self._deleted = 0
+        self._rebuilds += 1
+        self._size = sys.getsizeof(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        :return: The live and (estimated) deleted entries, their ratio, the size of the underlying dict in
+        bytes and the number of rebuilds so far.
+        """
+        live = len(self._data)
+        entries = live + self._deleted
+        return {
+            "live": live,
+            "deleted": self._deleted,
+            "tombstone_ratio": self._deleted / entries if entries else 0.0,
+            "sizeof": self._size,
+            "rebuilds": self._rebuilds,
+        }
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+
+def churn_benchmark(peak: int = 1_000_000, steady: int = 10_000, rounds: int = 5_000_000) -> None:
+    """
+    Simulate a cache which fills to `peak` keys, evicts down to `steady` keys, then churns (insert one key,
+    evict the oldest) for `rounds` operations, reporting the traced memory of a plain dict and a
+    CompactingDict after each phase.
+
+    Note: The plain dict recovers too once churn starts, as the first insert to find its table full rebuilds
+    it from the live entries; what CompactingDict saves is the memory held between the eviction and then.
+
+    Note: Traced memory stands in for RSS here; memory freed by the interpreter is not necessarily handed
+    back to the operating system, so RSS lags behind, but it is the traced memory which is reusable.
+    :param peak: The number of keys at the busiest moment.
+    :param steady: The number of keys held from then on.
+    :param rounds: The number of insert / evict pairs in the steady state.
+    :return: None
+    """
+    for name, build in (("dict", dict), ("CompactingDict", CompactingDict)):
+        gc.collect()
+        tracemalloc.start()
+        cache = build()
+        started = time.perf_counter()
+        phases = []
+        for key in range(peak):
+            cache[key] = None
+        phases.append(("filled", tracemalloc.get_traced_memory()[0]))
+        for key in range(peak - steady):
+            del cache[key]
+        phases.append(("evicted", tracemalloc.get_traced_memory()[0]))
+        oldest = peak - steady
+        for key in range(peak, peak + rounds):
+            cache[key] = None
+            del cache[oldest]
+            oldest += 1
+        phases.append(("churned", tracemalloc.get_traced_memory()[0]))
+        elapsed = time.perf_counter() - started
+        tracemalloc.stop()
+        report = ", ".join(f"{phase} {memory / 1048576:.1f}MB" for phase, memory in phases)
+        print(f"{name}: {report} ({elapsed:.1f}s traced)")
+        if isinstance(cache, CompactingDict):
+            print(f"    {cache.stats()}")
+        del cache
+
+
+if __name__ == "__main__":
+    cache = CompactingDict(threshold=0.5, min_size=8)
+    cache.update(dict.fromkeys(range(100)))
+    for key in range(90):
+        del cache[key]
+    print(cache.stats())  # {'live': 10, 'deleted': 1, 'tombstone_ratio': 0.09090909090909091, 'sizeof': 632, 'rebuilds': 3}
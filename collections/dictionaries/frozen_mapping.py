@@ -0,0 +1,287 @@
+"""
+A lookup table built once and read by many worker processes is usually a dict, pickled (or rebuilt) into
+every one of them; a dozen workers means a dozen private copies of the same, possibly huge, dict.
+
+`freeze(mapping, path)` writes a mapping to a file laid out as a sorted hash table instead, and
+FrozenMapping opens that file with mmap.  The pages are backed by the file itself, so every process which
+opens it shares a single copy in the page cache, and opening it is near instant no matter the size; only
+the pages actually touched are ever read in.
+
+The file holds:
+    -> a header; a magic number and the number of entries
+    -> hashes, the stable 64 bit hash of every key, sorted, as an array("Q")
+    -> slots, the record number belonging to each sorted hash, as an array("Q")
+    -> bounds and key ends, where every record (and the key within it) starts and ends, as arrays("Q")
+    -> records, in insertion order; each the canonical encoding of a key followed by its pickled value
+
+A lookup is a binary search of the hashes (O(log n), the hash array is read through a zero copy
+memoryview), then a byte comparison of the encoded key; only the value is ever unpickled.
+
+Views follow Note 12 and Note 18 in dictionary.py; `keys()`, `values()` and `items()` are views rather
+than lists, iterate in the insertion order of the frozen dict and support `in`, `len()` and set operations
+(keys and items) just like dict_keys and dict_items.  There is nothing to reflect changes of, as a
+FrozenMapping never changes.
+
+    >>> freeze({"a": 1, "b": [2, 3]}, "lookup.frozen")
+    2
+    >>> with FrozenMapping("lookup.frozen") as lookup:
+    ...     lookup["b"], "c" in lookup, list(lookup.items())
+    ([2, 3], False, [('a', 1), ('b', [2, 3])])
+
+Note: Keys must be str, bytes or int, which encode to canonical bytes; hash() cannot be used as it is
+salted per process for str and bytes.  As with dict (1 == True), a bool key finds its int.  Values can be
+anything pickle can handle.
+
+Note: The arrays are written in native byte order, a frozen file is only portable between machines of
+the same endianness.
+
+Note: A FrozenMapping pickles as its path, so handing one to a process pool sends a few bytes rather than
+the whole table; every worker maps the same file.  @see: `frozen_mapping_benchmark()`.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections.abc import ItemsView
+from collections.abc import Mapping
+from collections.abc import ValuesView
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Iterator
+
+MAGIC = b"FROZENM\x01"
+_HEADER = struct.Struct("<8sQ")
+
+
+def _key_bytes(key: Any) -> bytes:
+    """
+    :return: The canonical encoding of a key, the first byte tagging its type.
+    """
+    if isinstance(key, str):
+        return b"s" + key.encode("utf-8")
+    if isinstance(key, bytes):
+        return b"b" + key
+    if isinstance(key, int):
+        return b"i" + str(int(key)).encode("ascii")
+    raise TypeError(f"FrozenMapping keys must be str, bytes or int, not {type(key).__name__}")
+
+
+def _from_key_bytes(encoded: bytes) -> str | bytes | int:
+    kind, body = encoded[:1], encoded[1:]
+    if kind == b"s":
+        return body.decode("utf-8")
+    if kind == b"b":
+        return body
+    return int(body)
+
+
+def _hash(encoded: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def freeze(mapping: Mapping, path: str) -> int:
+    """
+    Write a mapping to a file which FrozenMapping can open.
+    :param mapping: The mapping to freeze, keys all str, bytes or int.
+    :param path: The file to write.
+    :return: The number of entries written.
+    """
+    encoded = [_key_bytes(key) for key in mapping]
+    order = sorted(range(len(encoded)), key=lambda index: _hash(encoded[index]))
+    hashes = array("Q", [_hash(encoded[index]) for index in order])
+    bounds, key_ends = array("Q", [0]), array("Q")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(encoded)))
+        # The arrays are written before the records, so their sizes are reserved and filled in last.
+        tables = f.tell()
+        f.write(bytes(8 * (4 * len(encoded) + 1)))
+        for key, value in zip(encoded, mapping.values()):
+            f.write(key)
+            key_ends.append(bounds[-1] + len(key))
+            record = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(record)
+            bounds.append(key_ends[-1] + len(record))
+        f.seek(tables)
+        for table in (hashes, array("Q", order), bounds, key_ends):
+            f.write(table.tobytes())
+    return len(encoded)
+
+
+class FrozenMapping(Mapping):
+    def __init__(self, path: str) -> None:
+        """
+        :param path: A file written by `freeze()`.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._size = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a frozen mapping")
+        n = self._size
+        view = memoryview(self._mmap)[_HEADER.size:]
+        self._hashes = view[:8 * n].cast("Q")
+        self._slots = view[8 * n:16 * n].cast("Q")
+        self._bounds = view[16 * n:24 * n + 8].cast("Q")
+        self._key_ends = view[24 * n + 8:32 * n + 8].cast("Q")
+        self._records = _HEADER.size + 32 * n + 8
+        view.release()
+
+    def _find(self, key: Any) -> int:
+        """
+        :return: The record number holding key, or -1.
+        """
+        try:
+            encoded = _key_bytes(key)
+        except TypeError:
+            return -1
+        hashes, h = self._hashes, _hash(encoded)
+        index = bisect.bisect_left(hashes, h)
+        # 64 bit hashes collide rarely, but they can; every record sharing the hash is compared.
+        while index < self._size and hashes[index] == h:
+            record = self._slots[index]
+            start = self._records + self._bounds[record]
+            if self._mmap[start:self._records + self._key_ends[record]] == encoded:
+                return record
+            index += 1
+        return -1
+
+    def _value(self, record: int) -> Any:
+        start, end = self._records + self._key_ends[record], self._records + self._bounds[record + 1]
+        return pickle.loads(self._mmap[start:end])
+
+    def _key(self, record: int) -> str | bytes | int:
+        start, end = self._records + self._bounds[record], self._records + self._key_ends[record]
+        return _from_key_bytes(self._mmap[start:end])
+
+    def __getitem__(self, key: Any) -> Any:
+        record = self._find(key)
+        if record < 0:
+            raise KeyError(key)
+        return self._value(record)
+
+    def __contains__(self, key: object) -> bool:
+        # Only the key bytes are compared, the value is never unpickled.
+        return self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[str | bytes | int]:
+        return map(self._key, range(self._size))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def values(self) -> ValuesView:
+        return _ValuesView(self)
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def close(self) -> None:
+        # Every memoryview of the mmap must be released before it will close.
+        for table in (self._hashes, self._slots, self._bounds, self._key_ends):
+            table.release()
+        self._mmap.close()
+
+    def __enter__(self) -> FrozenMapping:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __reduce__(self):
+        return type(self), (self.path,)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r}, {self._size} entries)"
+
+
+class _ValuesView(ValuesView):
+    def __iter__(self):
+        # Walks the records in order rather than looking every key back up.
+        return map(self._mapping._value, range(len(self._mapping)))
+
+
+class _ItemsView(ItemsView):
+    def __iter__(self):
+        mapping = self._mapping
+        return ((mapping._key(record), mapping._value(record)) for record in range(len(mapping)))
+
+
+def _load(table: Mapping | str) -> Mapping:
+    # A str is the path of a pickled dict, loaded the way a worker would otherwise get its own copy.
+    if isinstance(table, str):
+        with open(table, "rb") as f:
+            return pickle.load(f)
+    return table
+
+
+def _lookups(table: Mapping | str, keys: list) -> tuple[float, int]:
+    def run():
+        loaded = _load(table)
+        for key in keys:
+            loaded[key]
+        return loaded
+
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    loaded = run()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, memory
+
+
+def frozen_mapping_benchmark(size: int = 1_000_000, workers: int = 4, lookups: int = 100_000) -> None:
+    """
+    Compare `workers` processes each loading their own pickled copy of a dict of `size` entries against the
+    same workers sharing one FrozenMapping, reporting the traced memory held per worker and the time taken
+    to load the table and do `lookups` lookups.
+    :param size: The number of entries in the table.
+    :param workers: The number of worker processes.
+    :param lookups: The number of lookups each worker does.
+    :return: None
+    """
+    directory = tempfile.mkdtemp()
+    pickled, frozen = os.path.join(directory, "table.pickle"), os.path.join(directory, "table.frozen")
+    table = {f"key{i}": (i, f"value{i}") for i in range(size)}
+    with open(pickled, "wb") as f:
+        pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+    started = time.perf_counter()
+    freeze(table, frozen)
+    print(f"froze {size} entries in {time.perf_counter() - started:.1f}s, {os.path.getsize(frozen) / 1048576:.1f}MB")
+    keys = [f"key{i}" for i in range(0, size, max(1, size // lookups))][:lookups]
+    del table
+
+    with FrozenMapping(frozen) as lookup:
+        for name, shared in (("dict per worker", pickled), ("FrozenMapping", lookup)):
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_lookups, [shared] * workers, [keys] * workers))
+            elapsed = max(elapsed for elapsed, _ in results)
+            memory = sum(memory for _, memory in results)
+            print(f"{name}: {workers} workers, {memory / 1048576:.1f}MB traced in total, slowest {elapsed:.2f}s")
+
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "lookup.frozen")
+    freeze({"a": 1, b"b": [2, 3], 3: None}, path)
+    with FrozenMapping(path) as lookup:
+        print(lookup["a"], lookup[b"b"], lookup[3], lookup.get("z"))  # 1 [2, 3] None None
+        print(list(lookup.keys()), ("a", 1) in lookup.items())  # ['a', b'b', 3] True
+        print(lookup.keys() & {"a", "z"}, pickle.loads(pickle.dumps(lookup)) == lookup)  # {'a'} True
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
@@ -0,0 +1,214 @@
+"""
+dictionary.py notes what a dict costs: 240 bytes before anything is in it (Note 4), resizing whenever it is
+two thirds full (Note 5) and dummy entries left behind by `del` that never give memory back (Note 6).  On top
+of the table itself, every key and every value of an int -> int dict is a full int object (28+ bytes each),
+so a dict of a hundred million ints weighs in at well over 10GB.
+
+IntTable is an open addressing hash table for fixed width ints instead, its slots stored in three parallel,
+typed arrays:
+    -> keys, an array("q") of signed 64 bit keys
+    -> values, an array("q") of signed 64 bit values
+    -> states, a bytearray marking each slot EMPTY, LIVE or DELETED (a tombstone)
+
+That is 17 bytes per slot, no per entry objects at all.  Lookups hash the key (fibonacci hashing, multiply
+by 2 ** 64 / golden ratio and keep the top bits) and probe linearly until the key or an empty slot is found.
+
+Note: Just like dict (Note 6), deleting leaves a tombstone behind so that probing for other keys still
+works.  Tombstones are cleaned up whenever the table grows, or on demand by calling `compact()`, which
+rebuilds the table at the smallest size fitting the live entries, shrinking it if need be.
+
+Note: The load factor is configurable; lower is faster (shorter probe runs), higher is smaller.  dict uses 2/3.
+
+Note: Every probe runs as python bytecode, so an IntTable is several times slower than a dict per operation.
+It is a memory optimisation, not a speed one; @see: `int_table_benchmark()`.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import tracemalloc
+from array import array
+from collections.abc import ItemsView
+from collections.abc import MutableMapping
+from itertools import compress
+from typing import Iterator
+
+EMPTY, LIVE, DELETED = 0, 1, 2
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+class IntTable(MutableMapping):
+    def __init__(self, items=(), load_factor: float = 0.5, capacity: int = 8) -> None:
+        """
+        :param items: A mapping, or iterable of (key, value) pairs, to populate the table with.
+        :param load_factor: The fraction of slots (live or tombstone) filled before the table grows.
+        :param capacity: The initial number of slots, rounded up to a power of two.
+        """
+        if not 0 < load_factor < 1:
+            raise ValueError("load_factor must be between 0 and 1")
+        self.load_factor = load_factor
+        self._allocate(capacity)
+        self.update(items)
+
+    def _allocate(self, capacity: int) -> None:
+        self._bits = max(3, (capacity - 1).bit_length())
+        size = 1 << self._bits
+        self._keys = array("q", bytes(8 * size))
+        self._values = array("q", bytes(8 * size))
+        self._states = bytearray(size)
+        self._live = 0
+        self._deleted = 0
+
+    def _slot(self, key: int) -> tuple[int, bool]:
+        """
+        :return: (index, found); the slot holding key, or else the slot key should be inserted into.
+        """
+        keys, states = self._keys, self._states
+        mask = len(states) - 1
+        index = ((key * _GOLDEN) & _MASK64) >> (64 - self._bits)
+        tombstone = -1
+        while True:
+            state = states[index]
+            if state == EMPTY:
+                return (index if tombstone < 0 else tombstone), False
+            if state == LIVE:
+                if keys[index] == key:
+                    return index, True
+            elif tombstone < 0:
+                tombstone = index
+            index = (index + 1) & mask
+
+    def __getitem__(self, key: int) -> int:
+        if isinstance(key, int):
+            index, found = self._slot(key)
+            if found:
+                return self._values[index]
+        raise KeyError(key)
+
+    def __setitem__(self, key: int, value: int) -> None:
+        if not isinstance(key, int):
+            raise TypeError(f"IntTable keys must be int, not {type(key).__name__}")
+        index, found = self._slot(key)
+        if found:
+            self._values[index] = value
+            return
+        if (self._live + self._deleted + 1) > self.load_factor * len(self._states):
+            self._rebuild(2 * (self._live + 1))
+            index, _ = self._slot(key)
+        # Both stores raise (OverflowError, TypeError) for anything not fitting in 64 bits, and the slot is
+        # not yet LIVE, so a failed insert leaves nothing behind.
+        self._keys[index] = key
+        self._values[index] = value
+        if self._states[index] == DELETED:
+            self._deleted -= 1
+        self._states[index] = LIVE
+        self._live += 1
+
+    def __delitem__(self, key: int) -> None:
+        if isinstance(key, int):
+            index, found = self._slot(key)
+            if found:
+                self._states[index] = DELETED
+                self._live -= 1
+                self._deleted += 1
+                return
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, int) and self._slot(key)[1]
+
+    def __len__(self) -> int:
+        return self._live
+
+    def popitem(self) -> tuple[int, int]:
+        # The last live slot is found in C, rather than by MutableMapping.popitem iterating from slot 0.
+        index = self._states.rfind(LIVE)
+        if index < 0:
+            raise KeyError("popitem(): IntTable is empty")
+        self._states[index] = DELETED
+        self._live -= 1
+        self._deleted += 1
+        return self._keys[index], self._values[index]
+
+    def clear(self) -> None:
+        self._allocate(8)
+
+    def _live_slots(self) -> Iterator[int]:
+        return compress(range(len(self._states)), map(LIVE.__eq__, self._states))
+
+    def __iter__(self) -> Iterator[int]:
+        return map(self._keys.__getitem__, self._live_slots())
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def _rebuild(self, entries: int) -> None:
+        items = list(zip(self, map(self._values.__getitem__, self._live_slots())))
+        self._allocate(max(int(entries / self.load_factor) + 1, len(items) + 1))
+        for key, value in items:
+            self[key] = value
+
+    def compact(self) -> None:
+        """
+        Drop every tombstone, resizing the table to the smallest size fitting the live entries.
+        """
+        self._rebuild(self._live)
+
+    @property
+    def tombstones(self) -> int:
+        return self._deleted
+
+    @property
+    def capacity(self) -> int:
+        return len(self._states)
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._keys.__sizeof__() + self._values.__sizeof__() + self._states.__sizeof__()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+
+class _ItemsView(ItemsView):
+    def __iter__(self):
+        # Walks the parallel arrays directly rather than looking every key back up.
+        table = self._mapping
+        return zip(table, map(table._values.__getitem__, table._live_slots()))
+
+
+def int_table_benchmark(sizes: tuple = (10 ** 6, 10 ** 7, 10 ** 8), lookups: int = 100_000) -> None:
+    """
+    Build a dict and an IntTable of `size` int -> int entries, comparing their traced memory and the time
+    taken for `lookups` random lookups.  The 10 ** 8 dict alone needs over 10GB, trim sizes to suit.
+    :param sizes: The numbers of entries to try.
+    :param lookups: The number of lookups timed.
+    :return: None
+    """
+    for size in sizes:
+        probes = [random.randrange(size) * 7 for _ in range(lookups)]
+        for name, build in (("dict", dict), ("IntTable", lambda pairs: IntTable(pairs, capacity=2 * size))):
+            tracemalloc.start()
+            started = time.perf_counter()
+            table = build((key * 7, key) for key in range(size))
+            built = time.perf_counter() - started
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            started = time.perf_counter()
+            for key in probes:
+                table[key]
+            elapsed = time.perf_counter() - started
+            print(
+                f"{size} entries, {name}: {memory / 1048576:.1f}MB ({memory / size:.1f} bytes per entry), "
+                f"built in {built:.1f}s (traced), {lookups / elapsed:,.0f} lookups/s"
+            )
+            del table
+
+
+if __name__ == "__main__":
+    table = IntTable({1: 10, 2: 20, 3: 30})
+    del table[2]
+    print(table, table.tombstones, table.capacity)  # IntTable({1: 10, 3: 30}) 1 8
+    table.compact()
+    print(table.get(2), table[3], table.tombstones)  # None 30 0
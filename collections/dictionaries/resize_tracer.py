@@ -0,0 +1,153 @@
+"""
+dictionary.py claims a dict starts with room for 8 items (Note 3), resizes once two thirds full (Note 5) and
+grows 4x below 50,000 items, 2x above (Note 25).  set.py watches a set jump from 216 to 728 bytes on its
+fifth insert.  Every one of those resizes allocates a new table and re-inserts every entry into it, a stall
+which grows with the container.
+
+TracedDict and TracedSet are a dict and a set which watch `sys.getsizeof` across every inserting call,
+recording a ResizeEvent each time it changes:
+    -> kind, "dict" or "set"
+    -> size_before and size_after, in bytes
+    -> count, the number of entries once the call returned
+    -> elapsed, the seconds spent in the call, rehash included
+
+    >>> s = TracedSet()
+    >>> for i in range(5):
+    ...     s.add(i)
+    >>> [(event.size_before, event.size_after, event.count) for event in s.events]
+    [(224, 736, 5)]
+
+(8 bytes more than set.py shows, for the `events` slot of the subclass.)
+
+The events tell you what to pre-size a container to, and how much time its resizes cost in total;
+@see: `resize_benchmark()`, and presized.py for building containers at their final size up front.
+
+Note: Only inserting calls are watched; deleting never shrinks a table (Note 6 in dictionary.py).  A bulk
+`update()` may resize several times within one call to C, which shows up as a single event; so does
+building one from existing data, `TracedDict(big_mapping)`, which goes through `update()` to be watched.
+
+Note: The exact thresholds and growth factors have changed between python versions, which is exactly why
+they are worth measuring rather than assuming.  On 3.11 it is the set which grows 4x below 50,000 entries
+and 2x above; a dict resizes to fit 3x its used entries, roughly doubling every time.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import namedtuple
+from typing import Iterable
+
+ResizeEvent = namedtuple("ResizeEvent", "kind size_before size_after count elapsed")
+
+
+class TracedDict(dict):
+    __slots__ = ("events",)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__()
+        self.events: list[ResizeEvent] = []
+        # Filled after `events` exists, so resizes while building are recorded too.
+        self.update(*args, **kwargs)
+
+    def _traced(self, method, *args):
+        before = sys.getsizeof(self)
+        started = time.perf_counter()
+        result = method(self, *args)
+        elapsed = time.perf_counter() - started
+        after = sys.getsizeof(self)
+        if after != before:
+            self.events.append(ResizeEvent("dict", before, after, len(self), elapsed))
+        return result
+
+    def __setitem__(self, key, value) -> None:
+        self._traced(dict.__setitem__, key, value)
+
+    def setdefault(self, key, default=None):
+        return self._traced(dict.setdefault, key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        self._traced(lambda d: dict.update(d, *args, **kwargs))
+
+    def __ior__(self, other):
+        self._traced(dict.update, other)
+        return self
+
+
+class TracedSet(set):
+    __slots__ = ("events",)
+
+    def __init__(self, iterable: Iterable = ()) -> None:
+        super().__init__()
+        self.events: list[ResizeEvent] = []
+        self.update(iterable)
+
+    def _traced(self, method, *args):
+        before = sys.getsizeof(self)
+        started = time.perf_counter()
+        result = method(self, *args)
+        elapsed = time.perf_counter() - started
+        after = sys.getsizeof(self)
+        if after != before:
+            self.events.append(ResizeEvent("set", before, after, len(self), elapsed))
+        return result
+
+    def add(self, element) -> None:
+        self._traced(set.add, element)
+
+    def update(self, *iterables) -> None:
+        self._traced(set.update, *iterables)
+
+    def __ior__(self, other):
+        self._traced(set.update, other)
+        return self
+
+
+def summarise(events: list[ResizeEvent]) -> dict[str, float]:
+    """
+    :return: The number of resizes, the total and the longest time spent in them, and the final size.
+    """
+    return {
+        "resizes": len(events),
+        "total_seconds": sum(event.elapsed for event in events),
+        "worst_seconds": max((event.elapsed for event in events), default=0.0),
+        "final_bytes": events[-1].size_after if events else 0,
+    }
+
+
+def resize_benchmark(size: int = 10_000_000) -> None:
+    """
+    Fill a TracedDict and a TracedSet one insert at a time up to `size` entries, printing every resize; the
+    entry count it happened at, the growth in bytes, and the stall, followed by a summary.
+    :param size: The number of entries inserted.
+    :return: None
+    """
+    for name, container, insert in (
+        ("dict", TracedDict(), lambda c, i: c.__setitem__(i, None)),
+        ("set", TracedSet(), TracedSet.add),
+    ):
+        started = time.perf_counter()
+        for i in range(size):
+            insert(container, i)
+        elapsed = time.perf_counter() - started
+        print(f"{name}:")
+        for event in container.events:
+            print(
+                f"    resized at {event.count:>10,} entries: {event.size_before:>12,} -> {event.size_after:>12,} "
+                f"bytes ({event.size_after / event.size_before:.1f}x) in {event.elapsed * 1000:.3f}ms"
+            )
+        summary = summarise(container.events)
+        print(
+            f"    {summary['resizes']} resizes took {summary['total_seconds']:.3f}s of {elapsed:.2f}s, "
+            f"the longest {summary['worst_seconds'] * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    s = TracedSet()
+    for i in range(5):
+        s.add(i)
+    print([(event.size_before, event.size_after, event.count) for event in s.events])  # [(224, 736, 5)]
+    d = TracedDict()
+    d.update(dict.fromkeys(range(100)))
+    print(d.events[-1].count, len(d.events))  # 100 1
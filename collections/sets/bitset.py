@@ -0,0 +1,260 @@
+"""
+set.py covers membership, union, intersection and difference of general sets.  A set of small integers,
+ids below ten million say, pays for every element with a hash table slot (16 bytes, a table kept at most
+60% full) and an int object of its own (28 bytes); north of 60 bytes per id.
+
+A bitset stores the same set as a bitmap instead; bit n is set if n is in the set, one bit per possible
+id whether present or not.  Ten million possible ids fit in 1.25MB, however many of them are present.
+
+    -> BitSet is mutable (a MutableSet); `add`, `discard`, `remove` and the in-place operators
+       `|=`, `&=`, `-=` and `^=` (__ior__, __iand__, __isub__, __ixor__) modify it in place.
+    -> FrozenBitSet is immutable and hashable, just like frozenset has none of the in-place methods
+       (@see: the frozenset diff in set.py), neither does FrozenBitSet.
+
+Set algebra between two bitsets converts both bitmaps to a python int (`int.from_bytes`), applies the
+operator, and converts back; three calls into C doing a machine word at a time, rather than a loop over
+the elements in python.
+
+    >>> BitSet([1, 3, 5]) | BitSet([2, 3])
+    BitSet({1, 2, 3, 5})
+
+Note: Elements must be ints, zero or greater.  Memory is proportional to the largest element ever added,
+not to the number of elements, so a bitset of the single element 10 ** 9 costs 125MB; it is only worth it
+for dense sets of small ints.  Compressed bitmaps (roaring bitmaps) remove that restriction by storing each
+run of 65536 ids as whichever of a sorted array, a bitmap or a run list is smallest, but they need a C
+extension (e.g. pyroaring) to pay off and are not attempted here.
+
+Note: `len()` counts the bits set (`int.bit_count()`) each time it is called, it is O(size of the bitmap).
+`in` runs as python bytecode rather than C, and manages about two thirds of the lookups per second of a set.
+
+Note: A FrozenBitSet compares equal to a frozenset of the same elements, so it hashes the same too; as the
+frozenset hash means iterating every element, it is computed the first time it is asked for and kept.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import tracemalloc
+from collections.abc import MutableSet
+from collections.abc import Set
+from operator import and_
+from operator import or_
+from operator import sub
+from operator import xor
+from typing import Iterable
+from typing import Iterator
+
+# The positions of the bits set in every possible byte, so iteration can skip bit twiddling.
+_POSITIONS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def _check(element: object) -> int:
+    if not isinstance(element, int):
+        raise TypeError(f"bitset elements must be int, not {type(element).__name__}")
+    if element < 0:
+        raise ValueError(f"bitset elements must be zero or greater, not {element}")
+    return element
+
+
+class FrozenBitSet(Set):
+    __slots__ = ("_bits", "_hash_value")
+
+    def __init__(self, iterable: Iterable[int] = ()) -> None:
+        self._bits = self._build(iterable)
+
+    @classmethod
+    def _build(cls, iterable: Iterable[int]) -> bytes:
+        if isinstance(iterable, FrozenBitSet):
+            return bytes(iterable._bits)
+        elements = [_check(element) for element in iterable]
+        bits = bytearray(max(elements) // 8 + 1 if elements else 0)
+        for element in elements:
+            bits[element >> 3] |= 1 << (element & 7)
+        return bytes(bits)
+
+    @classmethod
+    def _from_int(cls, value: int) -> FrozenBitSet:
+        bitset = cls.__new__(cls)
+        bitset._bits = cls._wrap(value.to_bytes((value.bit_length() + 7) // 8, "little"))
+        return bitset
+
+    @staticmethod
+    def _wrap(data: bytes) -> bytes:
+        return data
+
+    def _int(self) -> int:
+        return int.from_bytes(self._bits, "little")
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable[int]) -> FrozenBitSet:
+        # Used by the collections.abc.Set mixins, whenever the other operand is not a bitset.
+        return cls(iterable)
+
+    def __contains__(self, element: object) -> bool:
+        if not isinstance(element, int) or element < 0:
+            return False
+        index = element >> 3
+        return index < len(self._bits) and bool(self._bits[index] >> (element & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self._bits):
+            if byte:
+                base = index << 3
+                for bit in _POSITIONS[byte]:
+                    yield base + bit
+
+    def __len__(self) -> int:
+        return self._int().bit_count()
+
+    def _binary(self, other: FrozenBitSet, operator) -> FrozenBitSet:
+        return type(self)._from_int(operator(self._int(), other._int()))
+
+    def __or__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._binary(other, int.__or__)
+        return super().__or__(other)
+
+    def __and__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._binary(other, int.__and__)
+        return super().__and__(other)
+
+    def __sub__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._binary(other, lambda a, b: a & ~b)
+        return super().__sub__(other)
+
+    def __xor__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._binary(other, int.__xor__)
+        return super().__xor__(other)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenBitSet):
+            return self._int() == other._int()
+        return super().__eq__(other)
+
+    def __le__(self, other):
+        if isinstance(other, FrozenBitSet):
+            mine = self._int()
+            return mine & other._int() == mine
+        return super().__le__(other)
+
+    def __ge__(self, other):
+        if isinstance(other, FrozenBitSet):
+            theirs = other._int()
+            return self._int() & theirs == theirs
+        return super().__ge__(other)
+
+    def isdisjoint(self, other: Iterable) -> bool:
+        if isinstance(other, FrozenBitSet):
+            return not self._int() & other._int()
+        return super().isdisjoint(other)
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash_value
+        except AttributeError:
+            self._hash_value = Set._hash(self)
+            return self._hash_value
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._bits.__sizeof__()
+
+    def __repr__(self) -> str:
+        # `discard` leaves zero bytes behind, so an empty bitset can still have bytes.
+        return f"{type(self).__name__}({{{', '.join(map(str, self))}}})" if any(self._bits) else f"{type(self).__name__}()"
+
+
+class BitSet(FrozenBitSet, MutableSet):
+    __slots__ = ()
+    __hash__ = None
+
+    @classmethod
+    def _build(cls, iterable: Iterable[int]) -> bytearray:
+        return bytearray(super()._build(iterable))
+
+    @staticmethod
+    def _wrap(data: bytes) -> bytearray:
+        return bytearray(data)
+
+    def add(self, element: int) -> None:
+        index = _check(element) >> 3
+        if index >= len(self._bits):
+            self._bits.extend(bytes(index + 1 - len(self._bits)))
+        self._bits[index] |= 1 << (element & 7)
+
+    def discard(self, element: int) -> None:
+        if element in self:
+            self._bits[element >> 3] &= ~(1 << (element & 7)) & 0xFF
+
+    def clear(self) -> None:
+        self._bits.clear()
+
+    def _inplace(self, other: FrozenBitSet, operator) -> BitSet:
+        value = operator(self._int(), other._int())
+        # Slice assignment keeps the same bytearray, so the object is modified in place.
+        self._bits[:] = value.to_bytes((value.bit_length() + 7) // 8, "little")
+        return self
+
+    def __ior__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._inplace(other, int.__or__)
+        return super().__ior__(other)
+
+    def __iand__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._inplace(other, int.__and__)
+        return super().__iand__(other)
+
+    def __isub__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._inplace(other, lambda a, b: a & ~b)
+        return super().__isub__(other)
+
+    def __ixor__(self, other):
+        if isinstance(other, FrozenBitSet):
+            return self._inplace(other, int.__xor__)
+        return super().__ixor__(other)
+
+
+def bitset_benchmark(universe: int = 10_000_000, density: float = 0.5, lookups: int = 1_000_000) -> None:
+    """
+    Compare set and BitSet holding two random sets of ids below `universe`, each id present with probability
+    `density`; the traced memory of building one, the time of each set operator and of `lookups` `in` checks.
+    :param universe: Every id is below this.
+    :param density: The fraction of possible ids present in each set.
+    :param lookups: The number of membership tests timed.
+    :return: None
+    """
+    ids = [[i for i in range(universe) if random.random() < density] for _ in range(2)]
+    probes = [random.randrange(universe) for _ in range(lookups)]
+    for name, build in (("set", set), ("BitSet", BitSet)):
+        tracemalloc.start()
+        a = build(ids[0])
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        b = build(ids[1])
+        timings = []
+        for symbol, operator in (("|", or_), ("&", and_), ("-", sub), ("^", xor)):
+            started = time.perf_counter()
+            operator(a, b)
+            timings.append(f"{symbol} {(time.perf_counter() - started) * 1000:.1f}ms")
+        started = time.perf_counter()
+        for probe in probes:
+            probe in a
+        elapsed = time.perf_counter() - started
+        print(f"{name}: {len(a)} ids in {memory / 1048576:.1f}MB, {', '.join(timings)}, {lookups / elapsed:,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    a, b = BitSet([1, 3, 5]), FrozenBitSet([2, 3])
+    print(a | b, a & b, a - b, a ^ b)  # BitSet({1, 2, 3, 5}) BitSet({3}) BitSet({1, 5}) BitSet({1, 2, 5})
+    a |= b
+    a.discard(5)
+    print(a, 3 in a, len(a), b <= a, {b: "hashable"}[frozenset({3, 2})])  # BitSet({1, 2, 3}) True 3 True hashable
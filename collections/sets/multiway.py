@@ -0,0 +1,122 @@
+"""
+set.py shows `x & y & z` and `x.intersection(*others)` taking any number of operands.  Chained operators
+are evaluated left to right though, every step building a new intermediate set, and neither form looks at
+the sizes of its operands; `huge & other_huge & tiny` builds the whole intersection of the two huge sets
+before the tiny one gets a say.
+
+intersection(), union() and difference() here take any number of operands and order the work by size:
+    -> intersection starts from the smallest operand and works up, so the running result is never larger
+       than the smallest set, and stops the moment it is empty (nothing can come back).
+    -> union copies the largest operand once and updates it with the rest, so the big table is built
+       (and resized) once, rather than copied into every intermediate.
+    -> difference takes the others largest first, as they are likeliest to shrink the result the most,
+       stops the moment the running result is empty, and for each operand picks whichever of
+       `result - other` (iterates the result) or `result -= other` (iterates other) walks the smaller set.
+       Starting with `first - largest` also skips copying first as it is.
+
+    >>> intersection({1, 2, 3, 4}, {3, 4, 5}, {4, 9})
+    {4}
+
+Note: Operands should be sets or frozensets; anything else with a len() works, but is slower to check
+membership against.  Results are always new sets, no operand is ever modified.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Set
+from typing import Collection
+
+
+def intersection(*operands: Collection) -> set:
+    """
+    :param operands: The sets to intersect.
+    :return: The elements in every operand.
+    """
+    if not operands:
+        return set()
+    ordered = sorted(operands, key=len)
+    result = set(ordered[0])
+    for operand in ordered[1:]:
+        if not result:
+            break
+        # The running result is never larger than operand, so & iterates the result.
+        result &= operand if isinstance(operand, Set) else set(operand)
+    return result
+
+
+def union(*operands: Collection) -> set:
+    """
+    :param operands: The sets to unite.
+    :return: The elements in any operand.
+    """
+    if not operands:
+        return set()
+    largest = max(operands, key=len)
+    result = set(largest)
+    result.update(*(operand for operand in operands if operand is not largest))
+    return result
+
+
+def difference(first: Collection, *others: Collection) -> set:
+    """
+    :param first: The set to take the others away from.
+    :param others: The sets whose elements are removed.
+    :return: The elements of first in none of the others.
+    """
+    result = None
+    for other in sorted(others, key=len, reverse=True):
+        current = first if result is None else result
+        if not current:
+            break
+        if len(other) >= len(current) and isinstance(other, Set):
+            # set - other walks current, checking each element against other.
+            remaining = current - other if isinstance(current, (set, frozenset)) else set(current) - other
+            result = remaining if type(remaining) is set else set(remaining)
+        else:
+            if result is None:
+                result = set(first)
+            # set -= other walks other, discarding each of its elements.
+            result -= other if isinstance(other, Set) else set(other)
+    return set(first) if result is None else result
+
+
+def multiway_benchmark(small: int = 10, large: int = 10_000_000, rounds: int = 10) -> None:
+    """
+    Time the chained operators, the built in methods and these functions over skewed operands; two sets of
+    `large` elements and one of `small` elements.
+    :param small: The size of the small operand.
+    :param large: The size of the large operands.
+    :param rounds: The number of times each is run, the quickest is kept.
+    :return: None
+    """
+    big, other_big = set(range(large)), set(range(large // 2, large + large // 2))
+    tiny = set(random.sample(range(large), small))
+    cases = (
+        ("big & other_big & tiny", lambda: big & other_big & tiny),
+        ("big.intersection(other_big, tiny)", lambda: big.intersection(other_big, tiny)),
+        ("intersection(big, other_big, tiny)", lambda: intersection(big, other_big, tiny)),
+        ("tiny | big | other_big", lambda: tiny | big | other_big),
+        ("tiny.union(big, other_big)", lambda: tiny.union(big, other_big)),
+        ("union(tiny, big, other_big)", lambda: union(tiny, big, other_big)),
+        ("tiny - big - other_big", lambda: tiny - big - other_big),
+        ("tiny.difference(big, other_big)", lambda: tiny.difference(big, other_big)),
+        ("difference(tiny, big, other_big)", lambda: difference(tiny, big, other_big)),
+        ("big - tiny - other_big", lambda: big - tiny - other_big),
+        ("big.difference(tiny, other_big)", lambda: big.difference(tiny, other_big)),
+        ("difference(big, tiny, other_big)", lambda: difference(big, tiny, other_big)),
+    )
+    for name, case in cases:
+        elapsed = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            case()
+            elapsed = min(elapsed, time.perf_counter() - started)
+        print(f"{name}: {elapsed * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    print(intersection({1, 2, 3, 4}, {3, 4, 5}, {4, 9}), intersection({1}, set(), {1}))  # {4} set()
+    print(union({1}, {2, 3}, frozenset({3, 4})))  # {1, 2, 3, 4}
+    print(difference({1, 2, 3, 4, 1337}, {1, 3}, range(100)), difference({1, 2}))  # {1337} {1, 2}
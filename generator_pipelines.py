@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import itertools
+import time
+import tracemalloc
+from collections import deque
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+
+"""
+generators.py compares the size of a 10,000 element list against a generator using `sys.getsizeof` and the
+generator wins by a mile.  Be careful with that comparison though, `sys.getsizeof` is shallow; it reports
+the size of the container object itself and nothing it references.  The list of ints is really its 80KB of
+pointers PLUS every int object it points to, and a generator frame holding on to a huge object looks just
+as small as one holding on to nothing at all.
+
+`tracemalloc` on the other hand traces every allocation made by the interpreter, so it tells the truth
+about how much memory is really alive.  This module grows the `gen()` idea into a small streaming pipeline
+of composable generator stages:
+
+    -> source: any iterable, pulled from lazily.
+    -> map: apply a function to every item.
+    -> filter: keep only the items a predicate approves of.
+    -> batch: group items into tuples of (at most) `size` items.
+    -> window: a sliding window of the last `size` items.
+    -> sink: drain the pipeline, optionally handing every item to a consumer.
+
+Every stage pulls one item at a time from the stage before it; nothing is produced before it is asked for,
+so there is no need for backpressure, and the only buffers are the fixed size ones inside batch and window.
+Memory is therefore constant no matter how long the source is, which `prove_constant_memory()` shows by
+probing each stage with tracemalloc; the most memory a single pull from each stage allocated and held on to,
+net of what the stages before it allocated during the same pull:
+
+    >>> pipeline = Pipeline(range(10), probe=True).map(lambda x: x * 2).filter(lambda x: x % 3).batch(2)
+    >>> list(pipeline)
+    [(2, 4), (8, 10), (14, 16)]
+    >>> pipeline.report()  # your numbers will vary
+    {'source': 0, 'map': 0, 'filter': 0, 'batch': 56}
+"""
+
+
+def _batched(it: Iterator, size: int) -> Iterator[tuple]:
+    while batch := tuple(itertools.islice(it, size)):
+        yield batch
+
+
+def _windowed(it: Iterator, size: int) -> Iterator[tuple]:
+    window = deque(itertools.islice(it, size - 1), maxlen=size)
+    for item in it:
+        window.append(item)
+        yield tuple(window)
+
+
+def _probed(name: str, it: Iterator, peaks: dict[str, int], attributed: list[int]) -> Iterator:
+    """
+    Measure the traced memory a stage allocates (net of what it frees) each time it is pulled from.  Pulling
+    from a stage runs every stage before it too, so the bytes those stages attributed to themselves during
+    the pull are taken off, leaving the stage's own share.
+    :param name: The name of the stage being probed.
+    :param it: The stage itself.
+    :param peaks: The mapping of stage name -> largest own share of a single pull to update.
+    :param attributed: A single counter of the bytes attributed so far, shared by every probe of a pipeline.
+    :return: yields the items of `it` untouched
+    """
+    while True:
+        before, upstream = tracemalloc.get_traced_memory()[0], attributed[0]
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        own = tracemalloc.get_traced_memory()[0] - before - (attributed[0] - upstream)
+        attributed[0] += own
+        if own > peaks[name]:
+            peaks[name] = own
+        yield item
+
+
+class Pipeline:
+    """
+    A chain of lazy generator stages, built up fluently and consumed by iterating it or calling `sink()`.
+    :param iterable: The source of the pipeline.
+    :param probe: Trace the memory each stage allocates as it yields, @see: `report()`.  This slows every
+    item down.  Tracing is started (if need be) when iteration begins, and stopped again once it ends.
+    """
+    def __init__(self, iterable: Iterable, probe: bool = False) -> None:
+        self.probe = probe
+        self.peaks: dict[str, int] = {}
+        self._attributed = [0]
+        self._started_tracing = False
+        self.it = self._stage("source", iter(iterable))
+
+    def _stage(self, name: str, it: Iterator) -> Iterator:
+        if not self.probe:
+            return it
+        self.peaks.setdefault(name, 0)
+        return _probed(name, it, self.peaks, self._attributed)
+
+    def map(self, func: Callable[[Any], Any]) -> Pipeline:
+        self.it = self._stage("map", map(func, self.it))
+        return self
+
+    def filter(self, predicate: Callable[[Any], bool]) -> Pipeline:
+        self.it = self._stage("filter", filter(predicate, self.it))
+        return self
+
+    def batch(self, size: int) -> Pipeline:
+        self.it = self._stage("batch", _batched(self.it, size))
+        return self
+
+    def window(self, size: int) -> Pipeline:
+        self.it = self._stage("window", _windowed(self.it, size))
+        return self
+
+    def __iter__(self) -> Iterator:
+        # Started on the first pull rather than in dunder __init__, so a pipeline never iterated never traces.
+        if self.probe and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        try:
+            yield from self.it
+        finally:
+            # Only tracing this pipeline started is stopped, a caller already tracing keeps tracing.
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def sink(self, consume: Callable[[Any], Any] | None = None) -> int:
+        """
+        Drain the pipeline.
+        :param consume: Called with every item, when omitted items are simply discarded.
+        :return: The number of items which reached the sink.
+        """
+        counter = itertools.count()
+        items = zip(self, counter)
+        if consume is None:
+            # A zero length deque drains an iterator entirely in C.
+            deque(items, maxlen=0)
+        else:
+            for item, _ in items:
+                consume(item)
+        return next(counter)
+
+    def report(self) -> dict[str, int]:
+        """
+        :return: A mapping of stage name -> the most bytes a single pull from that stage allocated and kept
+        hold of (net of its frees, and of the stages before it), for a probed pipeline.  Repeated stages (two
+        maps, for example) share a name and a peak.
+        """
+        return dict(self.peaks)
+
+
+def prove_constant_memory(sizes: tuple[int, ...] = (10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8)) -> None:
+    """
+    Push ever larger sources through the same probed pipeline; the peaks per stage stay flat, whereas
+    building a list of the source would grow linearly.  Tracing slows every allocation down,
+    so the 10 ** 8 run takes the best part of ten minutes.
+    :param sizes: The lengths of the sources to try.
+    :return: None
+    """
+    for size in sizes:
+        started = time.perf_counter()
+        pipeline = (
+            Pipeline(range(size), probe=True)
+            .map(lambda x: x * x)
+            .filter(lambda x: x % 3)
+            .batch(1000)
+            .window(4)
+        )
+        drained = pipeline.sink()
+        elapsed = time.perf_counter() - started
+        peaks = ", ".join(f"{name} {peak / 1024:.1f}KB" for name, peak in pipeline.report().items())
+        print(f"{size} items -> {drained} windows in {elapsed:.1f}s: {peaks}")
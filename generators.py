@@ -40,6 +40,10 @@ Results in:
 <class 'generator'>
 memory footprint of list: 0.00012969970703125 megabytes (hardly anything...)
 
+Note: sys.getsizeof is shallow, it does not count the ints the list points to, nor anything a generator
+frame is holding on to.  tracemalloc is the honest way to measure this, @see: generator_pipelines.py
+which grows these generators into composable streaming stages and probes them with tracemalloc.
+
 In order to iterate over the generator, we keep invoking next(gen) until it interally raises a StopIteration
 in which python uses as a flow of control to terminate, Lets see what that looks like:
 """
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import random
 import itertools
+import secrets
 import string
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
+from typing import Iterator
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, count_blocks() falls back to array('d').
+    numpy = None
 
 """
 The itertools module exposes a number of iterator building blocks.  The exposed functions
@@ -57,9 +70,30 @@ outlined below:
 class CrispPacket:
     flavours = ("beef", "cheese and onion", "salt and vinegar", "steak")
 
+    def __init__(self, seed: int | None = None) -> None:
+        """
+        Each packet owns its own random generator, @see: `reproducible_crisps()` towards the end of this document.
+        :param seed: Seeds the packets generator, a random seed is picked when omitted.
+        """
+        self.seed = secrets.randbits(128) if seed is None else seed
+        self.random = random.Random(self.seed)
+        # The number of children split off so far; every split carries on numbering where the last stopped.
+        self.spawned = 0
+
     def __iter__(self) -> CrispPacketIterator:
         return CrispPacketIterator(self)
 
+    def split(self, n: int) -> list[CrispPacket]:
+        """
+        Split this packet into `n` independent packets, each with its own deterministic stream of flavours.
+        :param n: The number of packets to split into.
+        :return: A list of `n` new packets, seeded from this packets seed and their position amongst every
+        packet ever split from it, so splitting again never hands out the same packets twice.
+        """
+        children = [CrispPacket(_derive_seed(self.seed, self.spawned + index)) for index in range(n)]
+        self.spawned += n
+        return children
+
 
 class CrispPacketIterator:
 
@@ -67,7 +101,25 @@ class CrispPacketIterator:
         self.source = source
 
     def __next__(self) -> str:
-        return random.choice(self.source.flavours)
+        return self.source.random.choice(self.source.flavours)
+
+    def next_batch(self, n: int) -> list[str]:
+        """
+        Draw `n` flavours in one call rather than `n` calls to dunder __next__.
+        @see: `batched_crisps()` towards the end of this document.
+        :param n: The number of flavours to draw.
+        :return: A list of `n` randomly chosen flavours.
+        """
+        return _draw_flavours(self.source.random, self.source.flavours, n)
+
+    def batches(self, size: int) -> Iterator[list[str]]:
+        """
+        An infinite, chunked counterpart to the plain iterator, yielding lists of `size` flavours.
+        :param size: The number of flavours in each chunk.
+        :return: yields a fresh list of flavours on each iteration
+        """
+        while True:
+            yield self.next_batch(size)
 
 
 def the_hello_world_of_iterators() -> None:
@@ -137,6 +189,24 @@ class ImprovedCrispPacket:
     def __next__(self) -> str:
         return random.choice(self.flavours)
 
+    def next_batch(self, n: int) -> list[str]:
+        """
+        Draw `n` flavours in one call rather than `n` calls to dunder __next__.
+        @see: `batched_crisps()` towards the end of this document.
+        :param n: The number of flavours to draw.
+        :return: A list of `n` randomly chosen flavours.
+        """
+        return _draw_flavours(random, self.flavours, n)
+
+    def batches(self, size: int) -> Iterator[list[str]]:
+        """
+        An infinite, chunked counterpart to the plain iterator, yielding lists of `size` flavours.
+        :param size: The number of flavours in each chunk.
+        :return: yields a fresh list of flavours on each iteration
+        """
+        while True:
+            yield self.next_batch(size)
+
 
 """
 Pretty successful, we have removed the need for an isolated Iterator class, returning
@@ -260,3 +330,240 @@ def count(start: float = 0, step: float = 1) -> int:
     """
     for number in itertools.count(100, 100):
         print(number)
+
+
+# Batched iteration
+
+"""
+Back to our crisp packets for a moment.  Every call to dunder __next__ on an `ImprovedCrispPacket` is a
+python level function call, which in turn calls `random.choice`, which in turn calls `random._randbelow`.
+Eating a million crisps costs a few million python level calls and that is where the time goes, not in
+actually picking a flavour.
+
+The fix is to draw a whole batch of flavours at once.  `random.randbytes(n)` hands back `n` random bytes
+from a single call implemented in C, each byte can then be treated as an index into `flavours`.  To keep
+every flavour equally likely we throw away the bytes that would bias the result (for 3 flavours, 256 does
+not divide evenly so bytes 255 and up are discarded) and map the rest onto indices with `bytes.translate`,
+which again happens entirely in C.  Finally `map(flavours.__getitem__, indices)` turns the array of indices
+back into flavours without a python level loop in sight.
+
+The plain per-item iterator is still there, `next_batch(n)` and `batches(size)` simply sit alongside it:
+
+    >>> packet = ImprovedCrispPacket()
+    >>> next(packet)
+    'steak'
+    >>> packet.next_batch(3)
+    ['beef', 'salt and vinegar', 'beef']
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _index_tables(size: int) -> tuple[bytes, bytes]:
+    """
+    Build the `bytes.translate` tables for drawing unbiased indices in range(size) from random bytes.
+    :param size: The number of flavours, at most 256.
+    :return: A tuple of (translation table, rejected bytes)
+    """
+    limit = 256 - 256 % size
+    return bytes(byte % size for byte in range(256)), bytes(range(limit, 256))
+
+
+def _draw_flavours(rng: Any, flavours: tuple[str, ...], n: int) -> list[str]:
+    """
+    Draw `n` flavours uniformly at random, using a precomputed array of indices into `flavours`.
+    :param rng: Anything exposing `randbytes` and `choices`, the `random` module or a `random.Random` instance.
+    :param flavours: The flavours to draw from.
+    :param n: The number of flavours to draw.
+    :return: A list of `n` flavours.
+    """
+    size = len(flavours)
+    if size > 256:
+        # A single byte can no longer index every flavour, choices() is still a single call.
+        return rng.choices(flavours, k=n)
+    table, rejected = _index_tables(size)
+    indices = bytearray()
+    while len(indices) < n:
+        # Over draw slightly so rejected bytes rarely cost us a second trip round the loop.
+        wanted = n - len(indices)
+        indices += rng.randbytes(wanted + (wanted >> 4) + 8).translate(table, rejected)
+    del indices[n:]
+    return list(map(flavours.__getitem__, indices))
+
+
+def batched_crisps(sizes: tuple[int, ...] = (10_000, 100_000, 1_000_000, 10_000_000), chunk: int = 65_536) -> None:
+    """
+    Compare eating crisps one at a time against eating them in batches of `chunk`.
+    :param sizes: The total number of crisps to eat for each run.
+    :param chunk: The number of crisps drawn per call to `next_batch`.
+    :return: None
+
+    Example output (your numbers will vary):
+        10000 crisps: per-item 0.0034s, batched 0.0006s (5.4x)
+        100000 crisps: per-item 0.0430s, batched 0.0094s (4.6x)
+        1000000 crisps: per-item 0.4691s, batched 0.0635s (7.4x)
+        10000000 crisps: per-item 4.5344s, batched 0.5461s (8.3x)
+    """
+    for size in sizes:
+        packet = ImprovedCrispPacket()
+        started = time.perf_counter()
+        for _ in itertools.islice(packet, size):
+            pass
+        per_item = time.perf_counter() - started
+
+        started = time.perf_counter()
+        remaining = size
+        while remaining:
+            eaten = packet.next_batch(min(chunk, remaining))
+            remaining -= len(eaten)
+        batched = time.perf_counter() - started
+        print(f"{size} crisps: per-item {per_item:.4f}s, batched {batched:.4f}s ({per_item / batched:.1f}x)")
+
+
+# Reproducible, parallel crisp eating
+
+"""
+The module level functions of `random` all share one hidden `random.Random` instance.  That is fine for
+a quick script, but it falls apart once crisp eating is fanned out to worker processes:
+
+    -> Forked workers inherit an identical copy of the hidden generator, so every worker eats the exact
+       same sequence of flavours (correlated streams).
+    -> Workers which reseed from the OS instead can never be replayed (unreproducible streams).
+    -> Threads all contend on the one generator.
+
+So each `CrispPacket` now owns its own `random.Random`, seeded from `seed`.  The Mersenne Twister behind
+`random.Random` has no cheap way to jump ahead by 2**N draws, so `split(n)` derives a fresh seed for every
+child instead, hashing the parents seed together with the childs position amongst every child the parent
+has split off so far (the same idea as numpy's `SeedSequence.spawn`, which counts its children the same
+way).  Children are deterministic given the parent seed, independent of each other, a second `split()`
+carries on from the first rather than replaying it, and children can themselves be split again without
+ever colliding with a sibling:
+
+    >>> packets = CrispPacket(seed=1337).split(4)
+    >>> [packet.seed == other.seed for packet, other in zip(packets, CrispPacket(seed=1337).split(4))]
+    [True, True, True, True]
+
+Note: `ImprovedCrispPacket` deliberately still uses the module level functions, for comparison.
+"""
+
+
+def _derive_seed(seed: int, index: int) -> int:
+    """
+    Derive a 128 bit child seed from a parent seed and the childs index.
+    :param seed: The parents seed.
+    :param index: The childs position amongst every child split from the parent.
+    :return: The childs seed.
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=16).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _eat_crisps(packet: CrispPacket, n: int) -> Counter:
+    """
+    Eat `n` crisps out of `packet` in a worker process, tallying up the flavours.
+    :param packet: The packet to eat from, pickled across to the worker with its generator.
+    :param n: The number of crisps to eat.
+    :return: A Counter of flavour -> crisps eaten.
+    """
+    tally = Counter()
+    it = iter(packet)
+    remaining = n
+    while remaining:
+        eaten = it.next_batch(min(65_536, remaining))
+        tally.update(eaten)
+        remaining -= len(eaten)
+    return tally
+
+
+def reproducible_crisps(seed: int = 1337, workers: tuple[int, ...] = (1, 2, 4, 8), per_worker: int = 2_000_000) -> None:
+    """
+    Fan crisp eating out across a `ProcessPoolExecutor`, each worker eating its own split of the packet.
+    Every worker eats the same number of crisps, so linear scaling shows up as flat wall clock time and
+    throughput that grows with the number of workers.  Running it twice with the same seed gives
+    identical tallies.
+    :param seed: The seed of the packet which is split between the workers.
+    :param workers: The worker counts to try.
+    :param per_worker: The number of crisps each worker eats.
+    :return: None
+    """
+    for count in workers:
+        packets = CrispPacket(seed).split(count)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=count) as pool:
+            tallies = list(pool.map(_eat_crisps, packets, itertools.repeat(per_worker)))
+        elapsed = time.perf_counter() - started
+        total = sum(tallies, Counter())
+        print(f"{count} workers: {elapsed:.3f}s, {count * per_worker / elapsed:,.0f} crisps/s, {dict(total)}")
+
+
+# Counting in blocks
+
+"""
+`count()` above hands out one python object per step, which is fine for printing but not for numeric work;
+every value then goes through the interpreter one at a time.  There is a subtler problem with floats too.
+`itertools.count(start, step)` gets to each value by repeatedly adding step to the previous one, so the
+rounding error of every addition accumulates:
+
+    >>> for value in itertools.islice(itertools.count(0, 0.1), 10_000_000):
+    ...     pass
+    >>> value, 9_999_999 * 0.1
+    (999999.8998389754, 999999.9)
+
+`count_blocks()` yields contiguous blocks of values instead (numpy arrays when numpy is installed, otherwise
+`array('d')`) ready for vectorised maths downstream, and computes every value as `start + i * step`, so the
+error of each value is that of a single multiply and add no matter how far along the count is.
+
+Note: The speed up comes from numpy.  Without it every value is still computed by the interpreter and
+summing an `array('d')` boxes every value back into a float, so the fallback is roughly 4x slower than
+`itertools.count`; it buys the exact values and a contiguous buffer (for struct, files, memoryview), not speed.
+"""
+
+
+def count_blocks(start: float = 0, step: float = 1, size: int = 4096, use_numpy: bool | None = None) -> Iterator[Any]:
+    """
+    An infinite count, handed out in contiguous blocks of `size` values.
+    :param start: The starting point, defaulting to 0
+    :param step: The incremental step, defaulting to 1
+    :param size: The number of values in each block
+    :param use_numpy: Force numpy arrays on (True) or off (False), by default numpy is used when installed.
+    :return: yields blocks of float values, block n holding start + i * step for i in [n * size, (n + 1) * size)
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    for offset in itertools.count(0, size):
+        if use_numpy:
+            yield start + step * numpy.arange(offset, offset + size, dtype=numpy.float64)
+        else:
+            yield array("d", [start + i * step for i in range(offset, offset + size)])
+
+
+def counting_in_blocks(total: int = 10_000_000, start: float = 0, step: float = 0.1, size: int = 65_536) -> None:
+    """
+    Compare summing `total` values from `itertools.count` against summing them block by block, and
+    compare how far the final value of each has drifted from start + (total - 1) * step.
+    :param total: The number of values to count.
+    :param start: The starting point of the count.
+    :param step: The incremental step of the count.
+    :param size: The number of values in each block.
+    :return: None
+    """
+    expected = start + (total - 1) * step
+
+    started = time.perf_counter()
+    running = 0.0
+    for value in itertools.islice(itertools.count(start, step), total):
+        running += value
+    print(f"itertools.count: {time.perf_counter() - started:.3f}s, last value off by {abs(value - expected):.3e}")
+
+    candidates = [("array('d')", False)] + ([("numpy", True)] if numpy is not None else [])
+    for name, use_numpy in candidates:
+        started = time.perf_counter()
+        running = 0.0
+        remaining = total
+        for block in count_blocks(start, step, size, use_numpy=use_numpy):
+            block = block[:remaining]
+            running += float(block.sum()) if use_numpy else sum(block)
+            remaining -= len(block)
+            if not remaining:
+                break
+        elapsed = time.perf_counter() - started
+        print(f"count_blocks ({name}): {elapsed:.3f}s, last value off by {abs(block[-1] - expected):.3e}")
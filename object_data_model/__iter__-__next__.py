@@ -26,20 +26,33 @@ Note: ??? Free __iter__ if you subclass abc.Iterator
 __getitem__(self, key=0); __getitem__(self, key=1); __getitem__(self, key=n)... & so fourth.
 
 """
+import codecs
+import itertools
+import mmap
+import os
 import re
+import tempfile
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from typing import Iterable
 
 
 WORDS_RE = re.compile(r"\w+")
+# A bytes `\w` only knows ASCII, so every byte of a multi byte UTF-8 character (all >= 0x80) counts too.
+BYTES_WORDS_RE = re.compile(rb"(?:\w|[\x80-\xff])+")
+NON_WORD_RE = re.compile(r"\W")
 
 
 class Sentence:
-    def __init__(self, text: str):
+    def __init__(self, text: str, offsets: bool = False):
         """
         A simple sentence class, that permits iterating over the space separated text it was provided.
         :param text: A string of text to parse into words.
+        :param offsets: Store the words compactly as offsets into text, @see: `WordOffsets`.
         """
-        self.words = WORDS_RE.findall(text)
+        self.words = WordOffsets(text) if offsets else WORDS_RE.findall(text)
 
     def __getitem__(self, key: int):
         """
@@ -49,6 +62,63 @@ class Sentence:
         return self.words[key]
 
 
+class WordOffsets:
+    """
+    A list of words costs a whole str object per word (50+ bytes each) on top of the list itself,
+    even when the caller only ever needs a handful of them, or just their positions.
+
+    WordOffsets keeps the original text and two `array("I")` of start and end offsets, 8 bytes per word,
+    and only builds a str when a word is actually looked up.  It supports len(), integer lookups in O(1)
+    and slicing (returning another WordOffsets), so it is a drop in replacement for the list of words
+    used by Sentence and SentenceIterator; both only ever index into it and wait for an IndexError.
+
+    Note: array("I") tops out at 2**32 - 1 on most platforms, longer texts switch to array("Q").
+    """
+    def __init__(self, text: str) -> None:
+        typecode = "I" if len(text) < 2 ** 32 else "Q"
+        self.text = text
+        self.starts = array(typecode)
+        self.ends = array(typecode)
+        add_start, add_end = self.starts.append, self.ends.append
+        for match in WORDS_RE.finditer(text):
+            start, end = match.span()
+            add_start(start)
+            add_end(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            view = WordOffsets.__new__(WordOffsets)
+            view.text, view.starts, view.ends = self.text, self.starts[key], self.ends[key]
+            return view
+        return self.text[self.starts[key]:self.ends[key]]
+
+    def span(self, key: int) -> tuple:
+        return self.starts[key], self.ends[key]
+
+
+def word_offsets_benchmark(words: int = 10_000_000) -> None:
+    """
+    Compare the traced memory of a list of words against WordOffsets for the same text.
+    :param words: The number of words in the generated text.
+    :return: None
+    """
+    vocabulary = ("how", "now", "brown", "cow", "the", "quick", "fox", "jumps")
+    text = " ".join(vocabulary[i % len(vocabulary)] + str(i % 1000) for i in range(words))
+    for name, build in (("list of str", WORDS_RE.findall), ("WordOffsets", WordOffsets)):
+        started = time.perf_counter()
+        build(text)
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        built = build(text)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name}: {len(built)} words, {current / 1048576:.1f}MB, built in {elapsed:.2f}s")
+        del built
+
+
 def is_sentence_iterable():
     se = Sentence("how now brown cow")
     print(issubclass(Sentence, Iterable))  # False
@@ -77,11 +147,45 @@ class NewStyleSentence:
     Remember; an iterable is something that when invoked by iter(x) returns an Iterator.
     Note to be confused by Iterator(which themselves are often iterable), but they implement __next__ too!
     """
-    def __init__(self, text: str) -> None:
-        self.words = WORDS_RE.findall(text)
+    def __init__(self, text: str, offsets: bool = False) -> None:
+        self.words = WordOffsets(text) if offsets else WORDS_RE.findall(text)
+        self.buffer = None
+        self.offsets = offsets
+
+    @classmethod
+    def from_file(cls, path: str, offsets: bool = False) -> "NewStyleSentence":
+        """
+        Build a sentence over a memory mapped file rather than a str, @see: `BufferSentenceIterator`.
+        Nothing is read or tokenized up front; the operating system pages the file in as the iterator
+        walks it and is free to drop those pages again afterwards, so files larger than RAM are fine.
+        :param path: The path of the file to map.
+        :param offsets: Iterate (start, end) byte offsets into the file rather than memoryview words.
+        """
+        sentence = cls.__new__(cls)
+        sentence.words = None
+        sentence.offsets = offsets
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap refuses to map an empty file.
+                sentence.buffer = b""
+                return sentence
+            sentence.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            sentence.buffer.madvise(mmap.MADV_SEQUENTIAL)
+        return sentence
+
+    def close(self) -> None:
+        """
+        Unmap the underlying file, if any.  A BufferError is raised while memoryview words, or iterators which
+        have not yet run to the end, are still alive; an exhausted iterator lets go of the file.
+        """
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
 
     def __iter__(self):
         # Dunder __iter__ implementations should always return a fresh iterator to avoid subtle defects.
+        if self.buffer is not None:
+            return BufferSentenceIterator(self.buffer, self.offsets)
         return SentenceIterator(self.words)
 
 
@@ -103,6 +207,37 @@ class SentenceIterator:
         return word
 
 
+class BufferSentenceIterator:
+    """
+    The bytes level sibling of SentenceIterator, walking `BYTES_WORDS_RE` matches over any buffer such as
+    an mmap.  Words are handed out as zero-copy memoryview slices of the buffer (or (start, end) offsets),
+    decoding only happens for the words a caller actually touches; `str(word, "utf-8")`.
+
+    Note: The buffer is taken to be UTF-8.  Any non ASCII character counts as part of a word, so words such as
+    `café` come out whole just as with `WORDS_RE`; the one difference is non ASCII punctuation and spaces
+    (an em dash, a no-break space), which `WORDS_RE` would split on and this keeps inside the word.
+    """
+    def __init__(self, buffer, offsets: bool = False) -> None:
+        self.view = memoryview(buffer)
+        self.matches = BYTES_WORDS_RE.finditer(buffer)
+        self.offsets = offsets
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            start, end = next(self.matches).span()
+        except StopIteration:
+            # Both the view and the match iterator pin the buffer, an mmap cannot close while either is alive.
+            self.matches = iter(())
+            self.view.release()
+            raise
+        if self.offsets:
+            return start, end
+        return self.view[start:end]
+
+
 class CoupledSentence:
     """
     This coupled class is often an anti pattern when people are creating their own
@@ -132,8 +267,12 @@ class CoupledSentence:
 
 
 class AGeneratorSentence:
-    def __init__(self, text: str):
-        self.words = WORDS_RE.findall(text)
+    def __init__(self, text: str, workers: int = 1):
+        """
+        :param text: A string of text to parse into words.
+        :param workers: Tokenize across this many processes, @see: `parallel_findall()`.
+        """
+        self.words = WORDS_RE.findall(text) if workers <= 1 else parallel_findall(text, workers)
 
     def __iter__(self):
         # here we return a generator function, no separate Iterator class is necessary now...
@@ -141,6 +280,150 @@ class AGeneratorSentence:
             yield word
 
 
+class StreamingSentence:
+    """
+    Every sentence class above runs `WORDS_RE.findall(text)` in dunder __init__, building a list of every
+    single word before the first one is handed out.  For a 2GB log that is a 2GB+ list sitting in memory.
+
+    StreamingSentence is the lazy alternative; it is built on `WORDS_RE.finditer` and reads its source one
+    chunk at a time, so memory is bounded by `chunk_size` (plus the longest word) instead of the input size.
+    The source can be:
+        -> A str, or bytes (decoded with `encoding`).
+        -> A file object opened in text or binary mode, anything with a .read(size) method.
+        -> An iterable of str or bytes chunks, such as a socket or a generator.
+
+    Note: A word can straddle two chunks ("hel" + "lo world"), so a match touching the end of the current
+    chunk is carried over and glued onto the front of the next chunk rather than being yielded early.
+
+    Note: A file object or iterator of chunks can only be consumed once, just like any other iterator;
+    a second pass over the same StreamingSentence will yield nothing for such sources.
+    """
+    def __init__(self, source, chunk_size: int = 64 * 1024, encoding: str = "utf-8") -> None:
+        self.source = source
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+
+    def __iter__(self):
+        carry = ""
+        for chunk in self._chunks():
+            buffer = carry + chunk
+            carry = ""
+            end = len(buffer)
+            for match in WORDS_RE.finditer(buffer):
+                if match.end() == end:
+                    # The word may continue in the next chunk, hold onto it for now.
+                    carry = match.group()
+                    break
+                yield match.group()
+        if carry:
+            yield carry
+
+    def _chunks(self):
+        source = self.source
+        if isinstance(source, str):
+            yield source
+            return
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            data, size = source, self.chunk_size
+            source = (data[i:i + size] for i in range(0, len(data), size))
+        elif hasattr(source, "read"):
+            source = iter(lambda: self.source.read(self.chunk_size), self.source.read(0))
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        for chunk in source:
+            yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+
+def streaming_sentence_benchmark(megabytes: int = 100) -> None:
+    """
+    Compare time to first word and peak (traced) memory of the eager NewStyleSentence against a
+    StreamingSentence reading the same file from disk.  Timings are taken on a separate pass from the
+    memory measurement, as tracemalloc slows down every allocation considerably.
+    :param megabytes: The rough size of the generated text file.
+    :return: None
+    """
+    line = "the quick brown fox jumps over the lazy dog\n"
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write(line * (megabytes * 1024 * 1024 // len(line)))
+    try:
+        for name, build in (
+            ("eager NewStyleSentence", lambda fh: NewStyleSentence(fh.read())),
+            ("StreamingSentence", StreamingSentence),
+        ):
+            started = time.perf_counter()
+            with open(f.name) as fh:
+                words = iter(build(fh))
+                next(words)
+                first_word = time.perf_counter() - started
+                for _ in words:
+                    pass
+            total = time.perf_counter() - started
+
+            tracemalloc.start()
+            with open(f.name) as fh:
+                for _ in build(fh):
+                    pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name}: first word {first_word:.4f}s, all words {total:.2f}s, peak {peak / 1048576:.1f}MB")
+    finally:
+        os.remove(f.name)
+
+
+def _shard(text: str, shards: int) -> list:
+    """
+    Cut text into roughly equal shards, nudging every cut forward onto a non word character so that
+    no word is ever split between two shards.
+    :param text: The text to cut up.
+    :param shards: The number of shards wanted, fewer are returned for tiny texts.
+    :return: A list of str shards which joined together are the original text.
+    """
+    size = max(len(text) // shards, 1)
+    cuts = [0]
+    for cut in range(size, len(text), size):
+        boundary = NON_WORD_RE.search(text, max(cut, cuts[-1]))
+        if boundary is None:
+            break
+        if boundary.start() > cuts[-1]:
+            cuts.append(boundary.start())
+    cuts.append(len(text))
+    return [text[start:end] for start, end in zip(cuts, cuts[1:])]
+
+
+def _tokenize_shard(shard: str) -> list:
+    return WORDS_RE.findall(shard)
+
+
+def parallel_findall(text: str, workers: int) -> list:
+    """
+    The equivalent of `WORDS_RE.findall(text)` spread across a process pool.  `pool.map` hands back
+    results in submission order, so chaining the shards back together keeps the original word order.
+
+    Note: Every shard is pickled to a worker and every word pickled back again, this only pays off
+    when the text is large and tokenizing it is the expensive part, @see: `parallel_tokenize_benchmark()`.
+    :param text: The text to tokenize.
+    :param workers: The number of worker processes.
+    :return: A list of words, identical to WORDS_RE.findall(text).
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(itertools.chain.from_iterable(pool.map(_tokenize_shard, _shard(text, workers))))
+
+
+def parallel_tokenize_benchmark(words: int = 5_000_000, workers: tuple = (1, 2, 4, 8)) -> None:
+    """
+    Time AGeneratorSentence tokenizing the same text with a growing number of worker processes.
+    :param words: The number of words in the generated text.
+    :param workers: The worker counts to try.
+    :return: None
+    """
+    text = " ".join(f"word{i % 10_000}" for i in range(words))
+    for count in workers:
+        started = time.perf_counter()
+        sentence = AGeneratorSentence(text, workers=count)
+        elapsed = time.perf_counter() - started
+        print(f"{count} workers: {len(sentence.words)} words in {elapsed:.2f}s")
+
+
 def _is_obj_iterable(obj) -> bool:
     try:
         _ = iter(obj)
@@ -164,6 +447,12 @@ def generators_to_the_rescue():
             print(word)
 
 
+def a_streaming_sentence():
+    chunks = [b"how now br", b"own cow, caf\xc3", b"\xa9 ", b"latte"]
+    for word in StreamingSentence(chunks):
+        print(word)  # how; now; brown; cow; café; latte
+
+
 def a_coupled_sentence():
     coupled_se = CoupledSentence("my sentence class is coupled")
     print("-----")
@@ -178,4 +467,5 @@ if __name__ == '__main__':
     true_sentence_iterability()
     dunder_iter_sentence()
     a_coupled_sentence()
-    generators_to_the_rescue()
\ No newline at end of file
+    generators_to_the_rescue()
+    a_streaming_sentence()
\ No newline at end of file